@@ -1,5 +1,7 @@
+from collections import OrderedDict
 from tkinter.scrolledtext import ScrolledText
-from tkinter import Tk
+from tkinter import Misc, Tk
+from tkinter.font import Font
 
 
 def SetWindowPos(
@@ -20,3 +22,30 @@ def SetWindowPos(
     )
 
     window.geometry("%dx%d+%d+%d" % (width, height, window_x, window_y))
+
+
+class FontCache(object):
+    def __init__(
+        self, master: Misc, family: str, step: int = 2, capacity: int = 24
+    ) -> None:
+        """Named fonts for a small set of quantized sizes, evicted LRU."""
+        self._master = master
+        self._family = family
+        self._step = step
+        self._capacity = capacity
+        self._fonts: OrderedDict[int, Font] = OrderedDict()
+
+    def quantize(self, size: float) -> int:
+        return max(1, self._step * round(size / self._step))
+
+    def get(self, size: int) -> Font:
+        if (font := self._fonts.get(size)) is not None:
+            self._fonts.move_to_end(size)
+            return font
+
+        font = self._fonts[size] = Font(
+            root=self._master, family=self._family, size=size
+        )
+        if len(self._fonts) > self._capacity:
+            self._fonts.popitem(last=False)
+        return font
@@ -1,7 +1,34 @@
 #!/home/yjtfx/Personal_Data/Python_Venv/Normal/bin/python
+import sys
+
+import instrument
+
+if "--timeline" in sys.argv:
+    sys.argv.remove("--timeline")
+    instrument.STARTUP.enabled = True
+if "--profile" in sys.argv:
+    sys.argv.remove("--profile")
+    instrument.PROFILER.enabled = True
+
+
+def export_profile() -> None:
+    if instrument.PROFILER.enabled:
+        instrument.PROFILER.write_json("profile.json")
+        instrument.PROFILER.write_chrome_trace("profile.trace.json")
+
+
+if len(sys.argv) > 1:
+    import cli
+
+    code = cli.main()
+    export_profile()
+    sys.exit(code)
+
 from main_ui import Application
 
+instrument.STARTUP.mark("import")
 app = Application("Test")
 app.load_config()
 app.bulid_gui()
 app.show()
+export_profile()
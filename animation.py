@@ -0,0 +1,163 @@
+import bisect as _bisect
+import math as _math
+import random as _random
+import time as _time
+import typing as _tp
+
+import instrument as _instrument
+
+if _tp.TYPE_CHECKING:
+    import tkinter as _tk
+
+_T = _tp.TypeVar("_T")
+
+
+class FrameScheduler(object):
+    def __init__(
+        self,
+        widget: "_tk.Misc",
+        callback: _tp.Callable[[float], None],
+        fps: int = 60,
+        name: str = "frame",
+    ) -> None:
+        """Coalesce requests into at most one `callback(now)` per frame.
+
+        `now` is the `time.monotonic()` timestamp of the frame, frame times are
+        reported to the profiler under `name`.
+        """
+        self._widget = widget
+        self._name = name
+        self._callback = callback
+        self._frame_interval = 1.0 / fps
+        self._last_frame = -_math.inf
+        self._pending: _tp.Optional[str] = None
+        self._looping = False
+
+    @property
+    def frame_interval(self) -> float:
+        return self._frame_interval
+
+    @property
+    def pending(self) -> bool:
+        return self._pending is not None
+
+    @property
+    def looping(self) -> bool:
+        return self._looping
+
+    def request(self) -> None:
+        if self._pending is not None:
+            return None
+
+        wait = self._last_frame + self._frame_interval - _time.monotonic()
+        if wait <= 0:
+            self._pending = self._widget.after_idle(self._run)
+        else:
+            self._pending = self._widget.after(_math.ceil(wait * 1000), self._run)
+
+    def cancel(self) -> None:
+        if self._pending is not None:
+            self._widget.after_cancel(self._pending)
+            self._pending = None
+
+    def start_loop(self) -> None:
+        """Call back on every frame until `stop_loop`.
+
+        The callback should derive its state from `now`, a frame that comes
+        late is simply dropped instead of being made up for.
+        """
+        self._looping = True
+        self.request()
+
+    def stop_loop(self) -> None:
+        self._looping = False
+        self.cancel()
+
+    def _run(self) -> None:
+        self._pending = None
+        self._last_frame = now = _time.monotonic()
+        self._callback(now)
+        if _instrument.PROFILER.enabled:
+            _instrument.PROFILER.frame(self._name, _time.monotonic() - now)
+        if self._looping:
+            self.request()
+
+
+class SpinSchedule(_tp.Generic[_T]):
+    ACCELERATION_TIME = 1.0
+    MIN_STOP_TIME = 1.5
+    MAX_STOP_TIME = 3.0
+    CYCLE_LENGTH = 64
+
+    def __init__(
+        self,
+        winner: _T,
+        sample: _tp.Callable[[], _T],
+        rng: _random.Random,
+        update_interval: int = 20,
+        max_interval: int = 1000,
+    ) -> None:
+        """Frame times and names of a whole spin, computed once at the start.
+
+        The spin speeds up over `ACCELERATION_TIME` s to one name per
+        `update_interval` ms, cruises until stopped, then slows down linearly
+        to one name per `max_interval` ms and lands on `winner` after a final
+        `max_interval` pause. Running names repeat a cycle of `sample()`
+        results. Looking up a frame is a bisect into the tables, times are in
+        seconds since the start (`spin_up`) or since the stop (`slow_down`).
+        """
+        self.winner = winner
+        max_rate = 1000.0 / update_interval
+        min_rate = max_rate / 10
+        accel_time = self.ACCELERATION_TIME
+        accel = (max_rate - min_rate) / accel_time
+
+        self.max_rate = max_rate
+        self.spin_up_position = min_rate * accel_time + accel * accel_time**2 / 2
+        self.spin_up = [
+            (_math.sqrt(min_rate**2 + 2 * accel * k) - min_rate) / accel
+            for k in range(1, int(self.spin_up_position) + 1)
+        ]
+
+        stop_time = rng.uniform(self.MIN_STOP_TIME, self.MAX_STOP_TIME)
+        end_rate = 1000.0 / max_interval
+        # position(t) = max_rate * t + half_accel * t**2, for t in [0, stop_time]
+        half_accel = (end_rate - max_rate) / (2 * stop_time)
+        steps = int(max_rate * stop_time + half_accel * stop_time**2)
+        if half_accel:
+            self.slow_down = [
+                (_math.sqrt(max_rate**2 + 4 * half_accel * k) - max_rate)
+                / (2 * half_accel)
+                for k in range(1, steps + 1)
+            ]
+        else:
+            self.slow_down = [k / max_rate for k in range(1, steps + 1)]
+        self.slow_down.append(stop_time + max_interval / 1000)
+
+        self.cycle = [sample() for _ in range(self.CYCLE_LENGTH)]
+        self.tail = [sample() for _ in range(steps)]
+        self.tail.append(winner)
+
+    @property
+    def stop_duration(self) -> float:
+        return self.slow_down[-1]
+
+    def step(self, __elapsed: float, /) -> int:
+        """Number of names shown `__elapsed` s after the start, before any stop."""
+        if __elapsed < self.ACCELERATION_TIME:
+            return _bisect.bisect_right(self.spin_up, __elapsed)
+        return int(
+            self.spin_up_position
+            + (__elapsed - self.ACCELERATION_TIME) * self.max_rate
+        )
+
+    def name_at(self, __elapsed: float, /, stopped: _tp.Optional[float] = None) -> _T:
+        """Name shown `__elapsed` s after the start, for a stop at `stopped` s."""
+        if (stopped is None) or (__elapsed < stopped):
+            return self.cycle[self.step(__elapsed) % len(self.cycle)]
+        if (index := _bisect.bisect_right(self.slow_down, __elapsed - stopped)) > 0:
+            return self.tail[index - 1]
+        return self.cycle[self.step(stopped) % len(self.cycle)]
+
+    def finished(self, __elapsed: float, /, stopped: _tp.Optional[float]) -> bool:
+        return (stopped is not None) and (__elapsed - stopped >= self.stop_duration)
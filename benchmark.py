@@ -0,0 +1,385 @@
+import argparse as _argparse
+import json as _json
+import os as _os
+import platform as _platform
+import random as _random
+import statistics as _statistics
+import sys as _sys
+import tempfile as _tempfile
+import time as _time
+import typing as _tp
+
+import animation as _animation
+import config as _config
+import journal as _journal
+import roster as _roster
+import rosterfile as _rosterfile
+import sampling as _sampling
+
+DEFAULT_SIZES = (30, 1000, 30000, 1000000)
+DEFAULT_TK_MAX_SIZE = 100000
+DEFAULT_THRESHOLD = 0.2
+
+
+class Case(_tp.NamedTuple):
+    run: _tp.Callable[[], _tp.Any]
+    before: _tp.Optional[_tp.Callable[[], _tp.Any]] = None
+
+
+class Result(_tp.NamedTuple):
+    name: str
+    size: int
+    repeat: int
+    best: float
+    median: float
+
+
+class Context(object):
+    def __init__(self, workdir: str) -> None:
+        """Fixtures shared by the benchmarks of one size, built on first use."""
+        self.workdir = workdir
+        self._root: _tp.Any = None
+
+    def path(self, __name: str, /) -> str:
+        return _os.path.join(self.workdir, __name)
+
+    @property
+    def root(self) -> _tp.Any:
+        """Tk root, withdrawn, with the config tkvars the widgets read."""
+        if self._root is None:
+            import tkinter as _tk
+
+            self._root = _tk.Tk()
+            self._root.wm_withdraw()
+            for name, value in _config.INIT_CONFIG.items():
+                if "tkvar" in name:
+                    var = _tk.Variable(self._root, value=value)
+                    setattr(_config, "CFG_%s" % name.upper(), var)
+        return self._root
+
+    def close(self) -> None:
+        if self._root is not None:
+            self._root.destroy()
+            self._root = None
+
+
+BENCHMARKS: dict[str, tuple[bool, _tp.Callable[[int, Context], Case]]] = {}
+
+
+def benchmark(__name: str, /, tk: bool = False):
+    def _register(func: _tp.Callable[[int, Context], Case]):
+        BENCHMARKS[__name] = (tk, func)
+        return func
+
+    return _register
+
+
+def synthetic_infos(size: int, seed: int = 0) -> list[_roster.NameInfo]:
+    rng = _random.Random(seed)
+    sexes = (_roster.MALE, _roster.FEMALE)
+    remakes = (_roster.EN, _roster.JP, _roster.NONE)
+    return [
+        _roster.NameInfo(
+            name="学生%07d" % i,
+            sex=rng.choice(sexes),
+            state=_roster.NOT_DRAWN,
+            remakes=rng.choice(remakes),
+        )
+        for i in range(size)
+    ]
+
+
+def synthetic_namelist(path: str, infos: _tp.Iterable[_roster.NameInfo]) -> str:
+    with open(path, "wt", encoding="UTF-8") as fp:
+        fp.writelines(line + "\n" for line in _roster.dump_namelist(infos))
+    return path
+
+
+def half_drawn(roster: _roster.Roster) -> None:
+    roster.reset()
+    roster.set_state_many(roster.row_ids[::2], _roster.DRAWN)
+
+
+@benchmark("roster.import")
+def _roster_import(size: int, ctx: Context) -> Case:
+    path = synthetic_namelist(ctx.path("namelist.txt"), synthetic_infos(size))
+
+    def _run() -> None:
+        roster = _roster.Roster()
+        for chunk in _roster.NamelistReader(path).chunks(500):
+            roster.insert_many(chunk)
+
+    return Case(_run)
+
+
+@benchmark("roster.filter")
+def _roster_filter(size: int, ctx: Context) -> Case:
+    roster = _roster.Roster(synthetic_infos(size))
+    half_drawn(roster)
+    criteria = _roster.filter_criteria(_config.CS_SPEC_SEX_MALE, _config.CS_NONE)
+    return Case(lambda: roster.select(**criteria))
+
+
+@benchmark("roster.reset")
+def _roster_reset(size: int, ctx: Context) -> Case:
+    roster = _roster.Roster(synthetic_infos(size))
+    return Case(roster.reset, lambda: half_drawn(roster))
+
+
+def full_draw(
+    roster: _roster.Roster, engine: _sampling.SamplingEngine, **criteria: str
+) -> Case:
+    """Pick one not-drawn row and commit it, as the GUI does on every draw."""
+    criteria["state"] = _roster.NOT_DRAWN
+
+    def _before() -> None:
+        roster.reset()
+        # Bring the engine and index tables up to date outside the timing.
+        engine.pick(roster.candidates(**criteria), roster.next_rng())
+
+    def _run() -> None:
+        candidates = roster.candidates(**criteria)
+        row_id = engine.pick(candidates, roster.next_rng())
+        roster.record_picks((row_id,))
+        roster.set_state(row_id, _roster.DRAWN)
+
+    return Case(_run, _before)
+
+
+@benchmark("draw.uniform")
+def _draw_uniform(size: int, ctx: Context) -> Case:
+    roster = _roster.Roster(synthetic_infos(size))
+    return full_draw(roster, _sampling.UniformEngine())
+
+
+@benchmark("draw.filtered")
+def _draw_filtered(size: int, ctx: Context) -> Case:
+    roster = _roster.Roster(synthetic_infos(size))
+    engine = _sampling.UniformEngine()
+    return full_draw(roster, engine, sex=_roster.FEMALE, remakes=_roster.JP)
+
+
+@benchmark("draw.weighted")
+def _draw_weighted(size: int, ctx: Context) -> Case:
+    roster = _roster.Roster(synthetic_infos(size))
+    roster.record_picks(roster.row_ids[::3])
+    return full_draw(roster, _sampling.WeightedEngine(roster))
+
+
+@benchmark("animation.spin_schedule")
+def _animation_spin_schedule(size: int, ctx: Context) -> Case:
+    """Build a spin schedule, then look up every frame of a 5 s spin at 60 fps."""
+    pool = _roster.RowPool(range(size))
+    rng = _random.Random(0)
+
+    def _run() -> None:
+        schedule = _animation.SpinSchedule(0, lambda: pool.sample(rng), rng)
+        elapsed = 0.0
+        while not schedule.finished(elapsed, 2.0):
+            schedule.name_at(elapsed, 2.0)
+            elapsed += 1 / 60
+
+    return Case(_run)
+
+
+@benchmark("save.config")
+def _save_config(size: int, ctx: Context) -> Case:
+    """config.json with the roster inlined, as it was stored before the journal."""
+    cfg = dict(_config.INIT_CONFIG)
+    cfg["names"] = _roster.dump_infos(synthetic_infos(size))
+    path = ctx.path("config.json")
+    return Case(lambda: _config.Write(cfg, path))
+
+
+@benchmark("save.snapshot")
+def _save_snapshot(size: int, ctx: Context) -> Case:
+    roster = _roster.Roster(synthetic_infos(size))
+    path = ctx.path("roster.rcsn")
+    return Case(lambda: _rosterfile.write(path, roster.rows(), roster.pick_counts))
+
+
+@benchmark("load.snapshot")
+def _load_snapshot(size: int, ctx: Context) -> Case:
+    roster = _roster.Roster(synthetic_infos(size))
+    journal = _journal.Journal(
+        ctx.path("roster.journal"), ctx.path("roster.{key}.rcsn")
+    )
+    journal.attach(_journal.ROSTER_NAMES, roster)
+    journal.compact(wait=True)
+    journal.close()
+
+    def _run() -> None:
+        state = journal.replay()
+        _roster.Roster().load_rows(state.rosters[_journal.ROSTER_NAMES].items())
+
+    return Case(_run)
+
+
+@benchmark("tk.namelist_load", tk=True)
+def _tk_namelist_load(size: int, ctx: Context) -> Case:
+    import main_ui as _main_ui
+
+    path = synthetic_namelist(ctx.path("namelist.txt"), synthetic_infos(size))
+    namelist = _main_ui.DrawNameList(ctx.root, virtual=True)
+    namelist.frame.pack_configure()
+
+    def _run() -> None:
+        namelist.load(path, dialog=False)
+        while namelist.importing:
+            ctx.root.update()
+
+    return Case(_run, namelist.roster.clear)
+
+
+@benchmark("tk.infoshower_update_text", tk=True)
+def _tk_infoshower_update_text(size: int, ctx: Context) -> Case:
+    import main_ui as _main_ui
+
+    info_shower = _main_ui.InfoShower(ctx.root)
+    info_shower.namelist.load_infos(synthetic_infos(size))
+    info_shower.init_state_info()
+    half_drawn(info_shower.namelist.roster)
+    ctx.root.update()
+    return Case(info_shower._update_text)
+
+
+@benchmark("tk.disk_prepare_show_text", tk=True)
+def _tk_disk_prepare_show_text(size: int, ctx: Context) -> Case:
+    import main_ui as _main_ui
+
+    info_shower = _main_ui.InfoShower(ctx.root)
+    drawer = _main_ui.DiskDrawer(ctx.root, info_shower, 80)
+    drawer.frame.pack_configure()
+    info_shower.namelist.load_infos(synthetic_infos(size))
+    ctx.root.update()
+    return Case(drawer.prepare_show_text)
+
+
+def run_case(name: str, size: int, case: Case, repeat: int) -> Result:
+    timings = []
+    for _ in range(repeat):
+        if case.before is not None:
+            case.before()
+        start = _time.perf_counter()
+        case.run()
+        timings.append(_time.perf_counter() - start)
+    return Result(name, size, repeat, min(timings), _statistics.median(timings))
+
+
+def tk_available() -> bool:
+    try:
+        import tkinter as _tk
+
+        _tk.Tk().destroy()
+    except Exception:
+        return False
+    return True
+
+
+def run(
+    names: _tp.Sequence[str],
+    sizes: _tp.Sequence[int],
+    repeat: int,
+    tk_max_size: int,
+) -> list[Result]:
+    results = []
+    with_tk = any(BENCHMARKS[n][0] for n in names) and tk_available()
+    for size in sizes:
+        with _tempfile.TemporaryDirectory() as workdir:
+            ctx = Context(workdir)
+            for name in names:
+                is_tk, func = BENCHMARKS[name]
+                if is_tk and ((not with_tk) or (size > tk_max_size)):
+                    continue
+                result = run_case(name, size, func(size, ctx), repeat)
+                print(
+                    "%-28s %9d  best %10.3f ms  median %10.3f ms"
+                    % (name, size, result.best * 1000, result.median * 1000),
+                    file=_sys.stderr,
+                )
+                results.append(result)
+            ctx.close()
+    if not with_tk and any(BENCHMARKS[n][0] for n in names):
+        print("No display, Tk benchmarks skipped (try xvfb-run).", file=_sys.stderr)
+    return results
+
+
+def dump(results: _tp.Iterable[Result]) -> dict[str, _tp.Any]:
+    return {
+        "meta": {
+            "python": _platform.python_version(),
+            "platform": _platform.platform(),
+            "time": _time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [r._asdict() for r in results],
+    }
+
+
+def compare(
+    results: _tp.Iterable[Result],
+    baseline: dict[str, _tp.Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[tuple[Result, float]]:
+    """Results slower than the baseline by more than `threshold`.
+
+    Best times are compared, they are far less noisy than medians.
+    """
+    bests = {(r["name"], r["size"]): r["best"] for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        if (base := bests.get((result.name, result.size))) is None:
+            continue
+        ratio = result.best / base if base else 1.0
+        flag = "REGRESSION" if ratio > 1.0 + threshold else ""
+        print(
+            "%-28s %9d  %6.2fx  %s" % (result.name, result.size, ratio, flag),
+            file=_sys.stderr,
+        )
+        if flag:
+            regressions.append((result, ratio))
+    return regressions
+
+
+def main(argv: _tp.Optional[_tp.Sequence[str]] = None) -> int:
+    parser = _argparse.ArgumentParser(
+        description="Time the roster, filter, draw and persistence paths."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(i) for i in s.split(",")],
+        default=DEFAULT_SIZES,
+        help="comma separated roster sizes, default: %s"
+        % ",".join(map(str, DEFAULT_SIZES)),
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--only", action="append", choices=sorted(BENCHMARKS), help="run only these"
+    )
+    parser.add_argument("--no-tk", action="store_true", help="skip the Tk paths")
+    parser.add_argument("--tk-max-size", type=int, default=DEFAULT_TK_MAX_SIZE)
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    if args.no_tk:
+        names = [n for n in names if not BENCHMARKS[n][0]]
+    results = run(names, args.sizes, args.repeat, args.tk_max_size)
+
+    if args.output:
+        with open(args.output, "wt", encoding="UTF-8") as fp:
+            _json.dump(dump(results), fp, indent=2)
+    elif not args.compare:
+        print(_json.dumps(dump(results), indent=2))
+
+    if args.compare:
+        with open(args.compare, "rt", encoding="UTF-8") as fp:
+            baseline = _json.load(fp)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    _sys.exit(main())
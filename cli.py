@@ -0,0 +1,249 @@
+import argparse as _argparse
+import json as _json
+import os as _os
+import sys as _sys
+import typing as _tp
+
+import config as _config
+import library as _library
+import roster as _roster
+import rosterfile as _rosterfile
+import sampling as _sampling
+
+
+class Session(object):
+    def __init__(self, roster_name: _tp.Optional[str] = None) -> None:
+        """Roster and config loaded without creating a Tk root."""
+        _config.Check()
+        _config.Load(convert=False)
+
+        self.library = _library.RosterLibrary(capacity=1)
+        self.loaded = self.library.open(roster_name or _config.CFG_CURRENT_ROSTER)
+        self.roster = self.loaded.names
+        self.deleted_roster = self.loaded.deleted
+
+    def engine(self, fair: _tp.Optional[bool] = None) -> _sampling.SamplingEngine:
+        if fair is None:
+            fair = _config.CFG_TKVAR_SET_FAIR_DRAW == "yes"
+        return self.loaded.engine(fair)
+
+    def candidates(
+        self, spec_sex: _tp.Optional[str], spec_remakes: _tp.Optional[str]
+    ) -> _tp.Collection[int]:
+        criteria = _roster.filter_criteria(
+            spec_sex or _config.CFG_TKVAR_SPEC_SEX,
+            spec_remakes or _config.CFG_TKVAR_SPEC_REMAKES,
+        )
+        return self.roster.candidates(**criteria)
+
+    def commit(self, row_ids: _tp.Sequence[int]) -> None:
+        self.roster.record_picks(row_ids)
+        self.roster.set_state_many(row_ids, _roster.DRAWN)
+
+    def save(self) -> None:
+        self.library.close()
+        _config.Save()
+
+
+def _print_infos(infos: _tp.Iterable[_roster.NameInfo]) -> None:
+    for info in infos:
+        print("\t".join(info))
+
+
+def _draw(session: Session, args: _argparse.Namespace) -> int:
+    if not (candidates := session.candidates(args.sex, args.remakes)):
+        print("No names left to draw.", file=_sys.stderr)
+        return 1
+
+    row_ids = session.engine(args.fair).pick_many(
+        candidates, args.count, session.roster.next_rng()
+    )
+    session.commit(row_ids)
+    session.save()
+    _print_infos(session.roster.get(i) for i in row_ids)
+    return 0
+
+
+def _groups(session: Session, args: _argparse.Namespace) -> int:
+    if not (candidates := session.candidates(args.sex, args.remakes)):
+        print("No names left to draw.", file=_sys.stderr)
+        return 1
+
+    groups = _sampling.partition(candidates, args.size, session.roster.next_rng())
+    session.commit([i for g in groups for i in g])
+    session.save()
+    for index, group in enumerate(groups, 1):
+        print("%d\t%s" % (index, " ".join(session.roster.get(i).name for i in group)))
+    return 0
+
+
+def _reset(session: Session, args: _argparse.Namespace) -> int:
+    print("Reset %d names." % len(session.roster.reset()))
+    session.save()
+    return 0
+
+
+def _list(session: Session, args: _argparse.Namespace) -> int:
+    if args.state:
+        infos = session.roster.select(state=args.state)
+    else:
+        infos = session.roster.items()
+    _print_infos(infos)
+    return 0
+
+
+def _import(session: Session, args: _argparse.Namespace) -> int:
+    if args.replace:
+        session.roster.clear()
+
+    extension = _os.path.splitext(args.file)[1].lower()
+    if extension == ".json":
+        with open(args.file, "rt", encoding="UTF-8") as fp:
+            session.roster.insert_many(_roster.load_infos(_json.load(fp)))
+    elif extension == ".rcsn":
+        with _rosterfile.RosterFile(args.file) as roster_file:
+            session.roster.insert_many(info for _, info in roster_file.rows())
+    else:
+        reader = _roster.NamelistReader(args.file)
+        for chunk in reader.chunks(1000):
+            session.roster.insert_many(chunk)
+        for issue in reader.issues:
+            print("line %d skipped, %s: %r" % (issue.lineno, issue.reason, issue.line))
+    session.save()
+    print("Roster has %d names." % len(session.roster), file=_sys.stderr)
+    return 0
+
+
+def _export(session: Session, args: _argparse.Namespace) -> int:
+    extension = _os.path.splitext(args.file)[1].lower()
+    if extension == ".json":
+        with open(args.file, "wt", encoding="UTF-8") as fp:
+            _json.dump(
+                _roster.dump_infos(session.roster.items()),
+                fp,
+                ensure_ascii=False,
+                indent=2,
+            )
+    elif extension == ".rcsn":
+        _rosterfile.write(
+            args.file,
+            session.roster.rows(),
+            session.roster.pick_counts,
+            session.roster.rng_state,
+        )
+    else:
+        with open(args.file, "wt", encoding="UTF-8") as fp:
+            fp.writelines(
+                line + "\n" for line in _roster.dump_namelist(session.roster.items())
+            )
+    print("Exported %d names." % len(session.roster), file=_sys.stderr)
+    return 0
+
+
+def _rosters(session: Session, args: _argparse.Namespace) -> int:
+    if args.create:
+        try:
+            session.library.create(args.create)
+        except (ValueError, OSError) as e:
+            print(e, file=_sys.stderr)
+            return 1
+    for name in session.library.names():
+        print(("* " if name == session.loaded.name else "  ") + name)
+    return 0
+
+
+def _positive_int(__value: str, /) -> int:
+    try:
+        value = int(__value)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise _argparse.ArgumentTypeError("%r is not a positive integer" % __value)
+    return value
+
+
+def build_parser() -> _argparse.ArgumentParser:
+    parser = _argparse.ArgumentParser(
+        prog="RandomChooseStudentName", description="Draw names without the GUI."
+    )
+    parser.add_argument("--config", help="config file, default: config.json")
+    parser.add_argument("--roster", help="named roster, default: the current one")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def _add_filters(command: _argparse.ArgumentParser) -> None:
+        command.add_argument(
+            "--sex",
+            choices=(
+                _config.CS_NONE,
+                _config.CS_SPEC_SEX_MALE,
+                _config.CS_SPEC_SEX_FEMALE,
+            ),
+        )
+        command.add_argument(
+            "--remakes",
+            choices=(
+                _config.CS_NONE,
+                _config.CS_SPEC_TYPE_EN,
+                _config.CS_SPEC_TYPE_JP,
+                _config.CS_SPEC_TYPE_NOREMAKES,
+            ),
+        )
+
+    draw = commands.add_parser("draw", help="draw names and mark them drawn")
+    draw.add_argument("-n", "--count", type=_positive_int, default=1)
+    draw.add_argument("--fair", action="store_true", default=None)
+    _add_filters(draw)
+    draw.set_defaults(func=_draw)
+
+    groups = commands.add_parser("groups", help="split the candidates into groups")
+    groups.add_argument("size", type=_positive_int)
+    _add_filters(groups)
+    groups.set_defaults(func=_groups)
+
+    reset = commands.add_parser("reset", help="mark every name not drawn")
+    reset.set_defaults(func=_reset)
+
+    list_ = commands.add_parser("list", help="print the roster")
+    list_.add_argument("--state", choices=(_roster.NOT_DRAWN, _roster.DRAWN))
+    list_.set_defaults(func=_list)
+
+    import_ = commands.add_parser(
+        "import", help="import a namelist.txt, .json or .rcsn file"
+    )
+    import_.add_argument("file")
+    import_.add_argument("--replace", action="store_true")
+    import_.set_defaults(func=_import)
+
+    export = commands.add_parser(
+        "export", help="export the roster as namelist.txt, .json or .rcsn"
+    )
+    export.add_argument("file")
+    export.set_defaults(func=_export)
+
+    rosters = commands.add_parser("rosters", help="list the named rosters")
+    rosters.add_argument("--create", metavar="NAME", help="add an empty roster")
+    rosters.set_defaults(func=_rosters)
+
+    return parser
+
+
+def main(argv: _tp.Optional[_tp.Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.config:
+        home = _os.path.dirname(_os.path.abspath(args.config))
+        _config.CONFIGPATH = args.config
+        _config.JOURNALPATH = _os.path.join(home, "roster.journal")
+        _config.SNAPSHOTPATH = _os.path.join(home, "roster.{key}.rcsn")
+        _config.LEGACY_SNAPSHOTPATH = _os.path.join(home, "roster.snapshot.json")
+        _config.ROSTERSPATH = _os.path.join(home, "rosters")
+
+    try:
+        session = Session(args.roster)
+    except KeyError:
+        print("No roster named %r." % args.roster, file=_sys.stderr)
+        return 1
+    return args.func(session, args)
+
+
+if __name__ == "__main__":
+    _sys.exit(main())
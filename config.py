@@ -1,22 +1,40 @@
 import json as _json
 import os as _os
-import tkinter as _tk
+import queue as _queue
+import threading as _threading
+import time as _time
 import typing as _typing
 
-VAR_OR_STR = _typing.Union[_tk.Variable, str]
+import instrument as _instrument
+
+if _typing.TYPE_CHECKING:
+    import tkinter as _tk
+
+VAR_OR_STR = _typing.Union["_tk.Variable", str]
 _T: _typing.Type[VAR_OR_STR] = VAR_OR_STR
 
 NAME = "config.json"
 HOMEPATH = _os.path.abspath(".")
 CONFIGPATH = _os.path.join(HOMEPATH, NAME)
+JOURNALPATH = _os.path.join(HOMEPATH, "roster.journal")
+SNAPSHOTPATH = _os.path.join(HOMEPATH, "roster.{key}.rcsn")
+LEGACY_SNAPSHOTPATH = _os.path.join(HOMEPATH, "roster.snapshot.json")
+ROSTERSPATH = _os.path.join(HOMEPATH, "rosters")
+
+# The default roster keeps the journal and snapshot paths above, other named
+# rosters live in their own directory under ROSTERSPATH.
+DEFAULT_ROSTER = "默认班级"
 
 CFG_TKVAR_SPEC_SEX: _T = "tkvar_spec_sex"
 CFG_TKVAR_SPEC_REMAKES: _T = "tkvar_spec_remakes"
 CFG_TKVAR_SET_ADAPT_SCREEN: _T = "tkvar_set_adapt_screen"
+CFG_TKVAR_SET_FAIR_DRAW: _T = "tkvar_set_fair_draw"
 
 CFG_NAMES = "names"
 CFG_DRAWN_NAMES = "drawn_names"
 CFG_DELETED_NAMES = "deleted_names"
+CFG_PICK_COUNTS = "pick_counts"
+CFG_CURRENT_ROSTER = "current_roster"
 
 CS_NONE = "none"
 CS_SPEC_SEX_MALE = "male"
@@ -32,6 +50,9 @@ INIT_CONFIG = {
     CFG_DELETED_NAMES: [],
     CFG_NAMES: [],
     CFG_TKVAR_SET_ADAPT_SCREEN: "no",
+    CFG_TKVAR_SET_FAIR_DRAW: "no",
+    CFG_PICK_COUNTS: {},
+    CFG_CURRENT_ROSTER: DEFAULT_ROSTER,
 }
 
 
@@ -41,15 +62,19 @@ def Init() -> None:
 
 
 def ConvertVar(_cfg: dict[str, _typing.Any], /) -> None:
+    import tkinter as _tk
+
     for k, v in _cfg.copy().items():
         if "tkvar" in k:
             _cfg[k] = _tk.Variable(value=v)
 
 
-def Load() -> None:
+def Load(convert: bool = True) -> None:
+    """Load the config into the module globals, `convert=False` keeps tkvars as str."""
     with open(CONFIGPATH, "rt") as fp:
-        conf: dict[str, _typing.Any] = _json.loads(fp.read())
-        ConvertVar(conf)
+        conf: dict[str, _typing.Any] = {**INIT_CONFIG, **_json.loads(fp.read())}
+        if convert:
+            ConvertVar(conf)
         global_namespace = globals()
         for k, v in conf.items():
             global_namespace["CFG_%s" % k.upper()] = v
@@ -60,18 +85,93 @@ def Check() -> None:
         Init()
 
 
-def Save() -> None:
+def Collect() -> dict[str, _typing.Any]:
     name_space = globals()
     cfgs = [i for i in name_space.keys() if i.startswith("CFG")]
 
     cfg_dict = {}
     for name in cfgs:
-        value: _typing.Union[_tk.Variable, _typing.Any] = name_space[name]
-        if "TKVAR" in name:
+        value: _typing.Union["_tk.Variable", _typing.Any] = name_space[name]
+        if ("TKVAR" in name) and (not isinstance(value, str)):
             value = value.get()
 
         cfg_dict[name.lower()[4:]] = value
 
-    print(cfg_dict)
-    with open(CONFIGPATH, "wt", encoding="UTF-8") as fp:
+    return cfg_dict
+
+
+@_instrument.PROFILER.span("config.save")
+def Write(cfg_dict: dict[str, _typing.Any], path: _typing.Optional[str] = None) -> None:
+    """Write atomically, through a temporary file renamed over the config."""
+    path = path or CONFIGPATH
+    temp_path = path + ".tmp"
+    with open(temp_path, "wt", encoding="UTF-8") as fp:
         fp.write(_json.dumps(cfg_dict))
+        fp.flush()
+        _os.fsync(fp.fileno())
+    _os.replace(temp_path, path)
+
+
+def Save() -> None:
+    Write(Collect())
+
+
+class AutoSaver(object):
+    MAX_LATENCY_RATIO = 5
+
+    def __init__(
+        self, debounce: float = 1.0, max_latency: _typing.Optional[float] = None
+    ) -> None:
+        """Write the config on a background thread.
+
+        `request` collects the values on the calling thread and queues them,
+        bursts within `debounce` seconds are coalesced into the last one. A
+        steady stream of requests is still written `max_latency` seconds after
+        its first one, `MAX_LATENCY_RATIO` times `debounce` by default.
+        Failures are queued for the UI to pick up with `poll_errors`.
+        """
+        self._debounce = debounce
+        if max_latency is None:
+            max_latency = debounce * self.MAX_LATENCY_RATIO
+        self._max_latency = max_latency
+        self._requests: _queue.Queue[_typing.Optional[tuple[str, dict]]]
+        self._requests = _queue.Queue()
+        self._errors: _queue.Queue[OSError] = _queue.Queue()
+        self._thread = _threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def request(self) -> None:
+        self._requests.put((CONFIGPATH, Collect()))
+
+    def poll_errors(self) -> list[OSError]:
+        errors = []
+        while True:
+            try:
+                errors.append(self._errors.get_nowait())
+            except _queue.Empty:
+                return errors
+
+    def _run(self) -> None:
+        while (item := self._requests.get()) is not None:
+            newer = item
+            deadline = _time.monotonic() + self._max_latency
+            while (timeout := min(self._debounce, deadline - _time.monotonic())) > 0:
+                try:
+                    if (newer := self._requests.get(timeout=timeout)) is None:
+                        break
+                except _queue.Empty:
+                    break
+                item = newer
+
+            try:
+                Write(item[1], item[0])
+            except OSError as e:
+                self._errors.put(e)
+
+            if newer is None:
+                break
+
+    def close(self) -> None:
+        """Flush any pending write and stop the thread."""
+        self._requests.put(None)
+        self._thread.join()
@@ -0,0 +1,234 @@
+import bisect as _bisect
+import collections as _collections
+import contextlib as _contextlib
+import functools as _functools
+import json as _json
+import os as _os
+import sys as _sys
+import threading as _threading
+import time as _time
+import typing as _tp
+
+_F = _tp.TypeVar("_F", bound=_tp.Callable[..., _tp.Any])
+_NULL_CONTEXT = _contextlib.nullcontext()
+
+
+class Timeline(object):
+    def __init__(self, start: _tp.Optional[float] = None) -> None:
+        """Named marks measured from `start` with `time.perf_counter`."""
+        self._start = _time.perf_counter() if start is None else start
+        self._marks: list[tuple[str, float]] = []
+        self.enabled = False
+
+    @property
+    def marks(self) -> list[tuple[str, float]]:
+        return self._marks.copy()
+
+    def mark(self, __label: str, /) -> None:
+        if self.enabled:
+            self._marks.append((__label, _time.perf_counter() - self._start))
+
+    def report(self) -> str:
+        lines = []
+        previous = 0.0
+        for label, elapsed in self._marks:
+            lines.append(
+                "%9.1f ms  (+%7.1f ms)  %s"
+                % (elapsed * 1000, (elapsed - previous) * 1000, label)
+            )
+            previous = elapsed
+        return "\n".join(lines)
+
+    def print_report(self, file: _tp.TextIO = _sys.stderr) -> None:
+        if self.enabled:
+            print(self.report(), file=file)
+
+
+STARTUP = Timeline()
+
+
+class SpanStats(object):
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, __duration: float, /) -> None:
+        self.count += 1
+        self.total += __duration
+        self.max = max(self.max, __duration)
+
+
+class Profiler(object):
+    TRACE_CAPACITY = 100000
+    # Upper bounds of the frame time buckets in milliseconds, the last bucket
+    # is open ended.
+    FRAME_BUCKETS = (8.0, 16.7, 33.3, 50.0, 100.0)
+
+    def __init__(self) -> None:
+        """Timing spans, counters and frame time histograms.
+
+        Everything is a no-op until `enabled` is set, a disabled span costs a
+        single attribute check.
+        """
+        self.enabled = False
+        self._start = _time.perf_counter()
+        self._lock = _threading.Lock()
+        self._spans: dict[str, SpanStats] = {}
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._frames: dict[str, list[int]] = {}
+        self._trace: _collections.deque[tuple[str, float, float, int]]
+        self._trace = _collections.deque(maxlen=self.TRACE_CAPACITY)
+
+    def span(self, __name: str, /) -> _tp.Callable[[_F], _F]:
+        """Decorator timing every call of the function as span `__name`."""
+
+        def _decorator(func: _F) -> _F:
+            @_functools.wraps(func)
+            def _wrapper(*args: _tp.Any, **kwargs: _tp.Any) -> _tp.Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = _time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(__name, start, _time.perf_counter() - start)
+
+            return _tp.cast(_F, _wrapper)
+
+        return _decorator
+
+    @_contextlib.contextmanager
+    def _measure(self, __name: str, /) -> _tp.Iterator[None]:
+        start = _time.perf_counter()
+        try:
+            yield None
+        finally:
+            self.record(__name, start, _time.perf_counter() - start)
+
+    def measure(self, __name: str, /) -> _tp.ContextManager[None]:
+        """Context manager timing a block as span `__name`."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._measure(__name)
+
+    def record(self, __name: str, __start: float, __duration: float, /) -> None:
+        with self._lock:
+            if (stats := self._spans.get(__name)) is None:
+                stats = self._spans[__name] = SpanStats()
+            stats.add(__duration)
+            self._trace.append(
+                (__name, __start - self._start, __duration, _threading.get_ident())
+            )
+
+    def count(self, __name: str, __value: int = 1, /) -> None:
+        if self.enabled:
+            with self._lock:
+                self._counters[__name] = self._counters.get(__name, 0) + __value
+
+    def gauge(self, __name: str, __value: float, /) -> None:
+        if self.enabled:
+            self._gauges[__name] = __value
+
+    def frame(self, __name: str, __duration: float, /) -> None:
+        if not self.enabled:
+            return None
+        if (buckets := self._frames.get(__name)) is None:
+            buckets = self._frames[__name] = [0] * (len(self.FRAME_BUCKETS) + 1)
+        buckets[_bisect.bisect_right(self.FRAME_BUCKETS, __duration * 1000)] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._start = _time.perf_counter()
+            self._spans.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self._frames.clear()
+            self._trace.clear()
+
+    def to_dict(self) -> dict[str, _tp.Any]:
+        with self._lock:
+            return {
+                "spans": {
+                    name: {
+                        "count": s.count,
+                        "total_ms": s.total * 1000,
+                        "max_ms": s.max * 1000,
+                    }
+                    for name, s in self._spans.items()
+                },
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "frames": {
+                    "buckets_ms": list(self.FRAME_BUCKETS),
+                    "histograms": {k: list(v) for k, v in self._frames.items()},
+                },
+            }
+
+    def chrome_trace(self) -> dict[str, _tp.Any]:
+        """Spans as complete events of the Chrome trace event format."""
+        pid = _os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, start, duration, tid in self._trace
+            ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> str:
+        data = self.to_dict()
+        lines = ["%-28s %7s %9s %9s" % ("span", "count", "avg ms", "max ms")]
+        for name, s in sorted(data["spans"].items()):
+            lines.append(
+                "%-28s %7d %9.2f %9.2f"
+                % (name, s["count"], s["total_ms"] / s["count"], s["max_ms"])
+            )
+        for name, value in sorted({**data["counters"], **data["gauges"]}.items()):
+            lines.append("%-28s %7g" % (name, value))
+        bounds = data["frames"]["buckets_ms"]
+        labels = ["<%g" % b for b in bounds] + [">=%g" % bounds[-1]]
+        for name, buckets in sorted(data["frames"]["histograms"].items()):
+            lines.append(
+                "%s frames: %s"
+                % (name, " ".join("%s:%d" % p for p in zip(labels, buckets)))
+            )
+        return "\n".join(lines)
+
+    def write_json(self, __path: str, /) -> None:
+        with open(__path, "wt", encoding="UTF-8") as fp:
+            _json.dump(self.to_dict(), fp, indent=2, ensure_ascii=False)
+
+    def write_chrome_trace(self, __path: str, /) -> None:
+        with open(__path, "wt", encoding="UTF-8") as fp:
+            _json.dump(self.chrome_trace(), fp, ensure_ascii=False)
+
+
+class TclCallCounter(object):
+    def __init__(self, tkapp: _tp.Any, profiler: Profiler) -> None:
+        """Stand-in for a Tk root's `tk` attribute counting Tcl calls.
+
+        Widgets copy `master.tk` when created, so this has to replace the root's
+        interpreter before any widget exists.
+        """
+        self._tkapp = tkapp
+        self._profiler = profiler
+
+    def call(self, *args: _tp.Any) -> _tp.Any:
+        self._profiler.count("tcl calls")
+        return self._tkapp.call(*args)
+
+    def __getattr__(self, __name: str, /) -> _tp.Any:
+        return getattr(self._tkapp, __name)
+
+
+PROFILER = Profiler()
@@ -0,0 +1,303 @@
+import json as _json
+import os as _os
+import threading as _threading
+import typing as _tp
+
+import config as _config
+import instrument as _instrument
+import roster as _roster
+import rosterfile as _rosterfile
+
+ROSTER_NAMES = "names"
+ROSTER_DELETED = "deleted"
+
+
+class JournalState(_tp.NamedTuple):
+    rosters: dict[str, dict[int, _roster.NameInfo]]
+    pick_counts: dict[str, dict[str, int]]
+    rng_states: dict[str, _roster.RngState]
+
+
+class Journal(object):
+    def __init__(
+        self,
+        path: str,
+        snapshot_path: str,
+        keys: _tp.Sequence[str] = (ROSTER_NAMES, ROSTER_DELETED),
+        fsync_interval: float = 0.5,
+        compact_threshold: int = 1 << 20,
+        legacy_snapshot_path: _tp.Optional[str] = None,
+    ) -> None:
+        """Append-only log of roster events with a compacted snapshot.
+
+        Every event carries the full resulting row data (or absolute pick
+        counts), so replaying a segment twice gives the same state. Writes are
+        fsynced in batches by a background thread, once the log grows past
+        `compact_threshold` bytes it is rotated and folded into the snapshot
+        in the background. The snapshot is one binary roster file per key,
+        `snapshot_path` is formatted with `key=`.
+        """
+        self._path = path
+        self._compacting_path = path + ".compacting"
+        self._snapshot_path = snapshot_path
+        self._legacy_snapshot_path = legacy_snapshot_path
+        self._keys = tuple(keys)
+        self._fsync_interval = fsync_interval
+        self._compact_threshold = compact_threshold
+
+        self._rosters: dict[str, _roster.Roster] = {}
+        self._listeners: dict[str, _tp.Callable[[_roster.RosterChange], None]] = {}
+        self._lock = _threading.Lock()
+        self._fp: _tp.Optional[_tp.BinaryIO] = None
+        self._size = 0
+        self._dirty = False
+        self._closed = _threading.Event()
+        self._compactor: _tp.Optional[_threading.Thread] = None
+        self._syncer: _tp.Optional[_threading.Thread] = None
+
+    def snapshot_path(self, key: str) -> str:
+        return self._snapshot_path.format(key=key)
+
+    @property
+    def exists(self) -> bool:
+        paths = [self.snapshot_path(k) for k in self._keys]
+        paths.extend((self._compacting_path, self._path))
+        if self._legacy_snapshot_path:
+            paths.append(self._legacy_snapshot_path)
+        return any(_os.path.exists(p) for p in paths)
+
+    @property
+    def needs_migration(self) -> bool:
+        """No journal yet, or one still using the legacy JSON snapshot."""
+        legacy_path = self._legacy_snapshot_path
+        return not self.exists or bool(legacy_path and _os.path.exists(legacy_path))
+
+    @staticmethod
+    def _apply(state: JournalState, event: dict[str, _tp.Any]) -> None:
+        rows = state.rosters.setdefault(event["roster"], {})
+        event_type = event["event"]
+        if event_type in (_roster.EVENT_INSERT, _roster.EVENT_UPDATE):
+            for row_id, *info in event["rows"]:
+                rows[row_id] = _roster.NameInfo(*info)
+        elif event_type == _roster.EVENT_DELETE:
+            for row_id in event["ids"]:
+                rows.pop(row_id, None)
+        elif event_type == _roster.EVENT_CLEAR:
+            rows.clear()
+        elif event_type == _roster.EVENT_PICK:
+            state.pick_counts.setdefault(event["roster"], {}).update(event["counts"])
+            if "rng" in event:
+                state.rng_states[event["roster"]] = _roster.RngState(*event["rng"])
+
+    def replay(self) -> JournalState:
+        """Snapshot, then any unfinished compaction segment, then the live log."""
+        state = JournalState({}, {}, {})
+        legacy_path = self._legacy_snapshot_path
+        if legacy_path and _os.path.exists(legacy_path):
+            with open(legacy_path, "rt", encoding="UTF-8") as fp:
+                snapshot = _json.load(fp)
+            for key, rows in snapshot["rosters"].items():
+                state.rosters[key] = {
+                    row_id: _roster.NameInfo(*info) for row_id, *info in rows
+                }
+            state.pick_counts.update(snapshot["pick_counts"])
+
+        for key in self._keys:
+            if _os.path.exists(path := self.snapshot_path(key)):
+                with _rosterfile.RosterFile(path) as roster_file:
+                    state.rosters[key] = dict(roster_file.rows())
+                    state.pick_counts[key] = roster_file.pick_counts()
+                    state.rng_states[key] = roster_file.rng_state
+
+        for path in (self._compacting_path, self._path):
+            if not _os.path.exists(path):
+                continue
+            with open(path, "rb") as fp:
+                for line in fp:
+                    # A line without its newline was torn by a crash.
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        event = _json.loads(line)
+                    except ValueError:
+                        continue
+                    self._apply(state, event)
+
+        return state
+
+    def attach(self, key: str, roster: _roster.Roster) -> None:
+        def _changed(change: _roster.RosterChange) -> None:
+            self._record(key, roster, change)
+
+        self._rosters[key] = roster
+        self._listeners[key] = _changed
+        roster.subscribe(_changed)
+
+    def detach(self, key: str) -> None:
+        if (roster := self._rosters.pop(key, None)) is not None:
+            roster.unsubscribe(self._listeners.pop(key))
+
+    @staticmethod
+    def _truncate_torn(__path: str, /) -> None:
+        """Cut a half-written last line left by a crash, so appends start clean."""
+        if not _os.path.exists(__path):
+            return None
+        with open(__path, "r+b") as fp:
+            end = position = fp.seek(0, _os.SEEK_END)
+            while position > 0:
+                start = max(0, position - 4096)
+                fp.seek(start)
+                if (newline := fp.read(position - start).rfind(b"\n")) >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                fp.truncate(position)
+
+    def _open(self) -> _tp.BinaryIO:
+        if self._fp is None:
+            self._truncate_torn(self._path)
+            self._fp = open(self._path, "ab")
+            self._size = self._fp.tell()
+        if self._syncer is None:
+            self._syncer = _threading.Thread(target=self._sync_loop, daemon=True)
+            self._syncer.start()
+        return self._fp
+
+    def _record(
+        self, key: str, roster: _roster.Roster, change: _roster.RosterChange
+    ) -> None:
+        event: dict[str, _tp.Any] = {"roster": key, "event": change.event_type}
+        if change.event_type in (_roster.EVENT_INSERT, _roster.EVENT_UPDATE):
+            event["rows"] = [(i, *roster.get(i)) for i in change.row_ids]
+        elif change.event_type == _roster.EVENT_DELETE:
+            event["ids"] = change.row_ids
+        elif change.event_type == _roster.EVENT_PICK:
+            event["counts"] = {
+                roster.get(i).name: roster.pick_count(i) for i in change.row_ids
+            }
+            event["rng"] = roster.rng_state
+        self.append(event)
+
+    def append(self, event: dict[str, _tp.Any]) -> None:
+        line = (_json.dumps(event, ensure_ascii=False) + "\n").encode("UTF-8")
+        with self._lock:
+            self._open().write(line)
+            self._size += len(line)
+            self._dirty = True
+
+        if (self._size > self._compact_threshold) and (self._compactor is None):
+            self.compact()
+
+    @_instrument.PROFILER.span("journal.fsync")
+    def _sync(self) -> None:
+        # fsync a duplicate of the descriptor outside the lock, so appends from
+        # the UI thread are not held up and a concurrent close cannot pull the
+        # file out from under it.
+        with self._lock:
+            if (not self._dirty) or (self._fp is None):
+                return None
+            self._fp.flush()
+            fd = _os.dup(self._fp.fileno())
+            self._dirty = False
+        try:
+            _os.fsync(fd)
+        finally:
+            _os.close(fd)
+
+    def _sync_loop(self) -> None:
+        while not self._closed.wait(self._fsync_interval):
+            self._sync()
+
+    def snapshot(self) -> dict[str, tuple[list, dict[str, int], _roster.RngState]]:
+        return {
+            key: (list(roster.rows()), roster.pick_counts, roster.rng_state)
+            for key, roster in self._rosters.items()
+        }
+
+    def compact(self, wait: bool = False) -> None:
+        """Rotate the log and fold it into the snapshot on a worker thread."""
+        if (compactor := self._compactor) is not None:
+            compactor.join()
+
+        with self._lock:
+            if self._fp is not None:
+                self._fp.flush()
+                _os.fsync(self._fp.fileno())
+                self._fp.close()
+                self._fp = None
+                self._dirty = False
+            else:
+                self._truncate_torn(self._path)
+            if _os.path.exists(self._path):
+                if _os.path.exists(self._compacting_path):
+                    # A previous compaction did not finish, keep its events.
+                    self._truncate_torn(self._compacting_path)
+                    with open(self._compacting_path, "ab") as dest:
+                        with open(self._path, "rb") as src:
+                            dest.write(src.read())
+                    _os.remove(self._path)
+                else:
+                    _os.replace(self._path, self._compacting_path)
+            self._size = 0
+        snapshot = self.snapshot()
+
+        compactor = self._compactor = _threading.Thread(
+            target=self._write_snapshot, args=(snapshot,), daemon=True
+        )
+        compactor.start()
+        if wait:
+            compactor.join()
+
+    @_instrument.PROFILER.span("journal.snapshot")
+    def _write_snapshot(
+        self, snapshot: dict[str, tuple[list, dict[str, int], _roster.RngState]]
+    ) -> None:
+        try:
+            for key, (rows, pick_counts, rng_state) in snapshot.items():
+                _rosterfile.write(self.snapshot_path(key), rows, pick_counts, rng_state)
+
+            legacy_path = self._legacy_snapshot_path
+            for path in (self._compacting_path, legacy_path):
+                if path and _os.path.exists(path):
+                    _os.remove(path)
+        finally:
+            # On failure the segment is kept and folded in by the next compaction.
+            self._compactor = None
+
+    def close(self) -> None:
+        if (compactor := self._compactor) is not None:
+            compactor.join()
+        self._closed.set()
+        self._sync()
+        with self._lock:
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+        for key in tuple(self._rosters):
+            self.detach(key)
+
+
+def load_state(journal: Journal, legacy: bool = True) -> JournalState:
+    """Replay the journal, or read the rosters from the legacy config lists."""
+    if journal.exists or not legacy:
+        return journal.replay()
+
+    return JournalState(
+        rosters={
+            ROSTER_NAMES: dict(enumerate(_roster.load_infos(_config.CFG_NAMES))),
+            ROSTER_DELETED: dict(
+                enumerate(_roster.load_infos(_config.CFG_DELETED_NAMES))
+            ),
+        },
+        pick_counts={ROSTER_NAMES: dict(_config.CFG_PICK_COUNTS)},
+        rng_states={},
+    )
+
+
+def migrate_legacy(journal: Journal) -> None:
+    """Move the rosters out of config.json or the JSON snapshot into a new one."""
+    journal.compact(wait=True)
+    _config.CFG_NAMES = []
+    _config.CFG_DELETED_NAMES = []
+    _config.CFG_PICK_COUNTS = {}
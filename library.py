@@ -0,0 +1,134 @@
+import collections as _collections
+import os as _os
+
+import config as _config
+import journal as _journal
+import roster as _roster
+import sampling as _sampling
+
+
+class LoadedRoster(object):
+    def __init__(
+        self, name: str, journal: _journal.Journal, state: _journal.JournalState
+    ) -> None:
+        """A named roster held in memory, with its journal and sampler state."""
+        self.name = name
+        self.journal = journal
+        self.rosters: dict[str, _roster.Roster] = {}
+        self._engines: dict[bool, _sampling.SamplingEngine] = {}
+
+        for key in (_journal.ROSTER_NAMES, _journal.ROSTER_DELETED):
+            roster = self.rosters[key] = _roster.Roster()
+            roster.load_rows(state.rosters.get(key, {}).items())
+            roster.load_pick_counts(state.pick_counts.get(key, {}))
+            roster.load_rng_state(state.rng_states.get(key, _roster.RngState()))
+            journal.attach(key, roster)
+
+    @property
+    def names(self) -> _roster.Roster:
+        return self.rosters[_journal.ROSTER_NAMES]
+
+    @property
+    def deleted(self) -> _roster.Roster:
+        return self.rosters[_journal.ROSTER_DELETED]
+
+    def engine(self, fair: bool) -> _sampling.SamplingEngine:
+        """Sampling engine for this roster, kept so its tables survive a switch."""
+        if (engine := self._engines.get(fair)) is None:
+            if fair:
+                engine = _sampling.WeightedEngine(self.names)
+            else:
+                engine = _sampling.UniformEngine()
+            self._engines[fair] = engine
+        return engine
+
+    def close(self) -> None:
+        self.journal.close()
+
+
+class RosterLibrary(object):
+    # Enough for a teacher's whole day of classes, 6 to 10, plus some slack.
+    CAPACITY = 12
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        """Named rosters stored side by side.
+
+        The most recently opened `capacity` rosters stay loaded, the least
+        recently used one is closed when another has to be loaded.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self._capacity = capacity
+        self._loaded: _collections.OrderedDict[str, LoadedRoster]
+        self._loaded = _collections.OrderedDict()
+
+    @staticmethod
+    def check_name(__name: str, /) -> str:
+        name = __name.strip()
+        if (not name) or (name in (_os.curdir, _os.pardir)):
+            raise ValueError("invalid roster name %r." % __name)
+        if any(sep and (sep in name) for sep in (_os.sep, _os.altsep)):
+            raise ValueError("roster name %r contains a path separator." % __name)
+        return name
+
+    @staticmethod
+    def journal_for(__name: str, /) -> _journal.Journal:
+        if __name == _config.DEFAULT_ROSTER:
+            return _journal.Journal(
+                _config.JOURNALPATH,
+                _config.SNAPSHOTPATH,
+                legacy_snapshot_path=_config.LEGACY_SNAPSHOTPATH,
+            )
+
+        home = _os.path.join(_config.ROSTERSPATH, __name)
+        return _journal.Journal(
+            _os.path.join(home, _os.path.basename(_config.JOURNALPATH)),
+            _os.path.join(home, _os.path.basename(_config.SNAPSHOTPATH)),
+        )
+
+    def names(self) -> list[str]:
+        names = [_config.DEFAULT_ROSTER]
+        if _os.path.isdir(_config.ROSTERSPATH):
+            names.extend(
+                sorted(
+                    entry.name
+                    for entry in _os.scandir(_config.ROSTERSPATH)
+                    if entry.is_dir() and entry.name != _config.DEFAULT_ROSTER
+                )
+            )
+        return names
+
+    def create(self, __name: str, /) -> str:
+        name = self.check_name(__name)
+        if name in self.names():
+            raise ValueError("roster %r already exists." % name)
+        _os.makedirs(_os.path.join(_config.ROSTERSPATH, name))
+        return name
+
+    @property
+    def loaded(self) -> tuple[str, ...]:
+        return tuple(self._loaded)
+
+    def open(self, __name: str, /) -> LoadedRoster:
+        if (loaded := self._loaded.get(__name)) is not None:
+            self._loaded.move_to_end(__name)
+            return loaded
+        if __name not in self.names():
+            raise KeyError(__name)
+
+        journal = self.journal_for(__name)
+        is_default = __name == _config.DEFAULT_ROSTER
+        migrate = is_default and journal.needs_migration
+        state = _journal.load_state(journal, legacy=is_default)
+        loaded = self._loaded[__name] = LoadedRoster(__name, journal, state)
+        if migrate:
+            _journal.migrate_legacy(journal)
+
+        while len(self._loaded) > self._capacity:
+            _, evicted = self._loaded.popitem(last=False)
+            evicted.close()
+        return loaded
+
+    def close(self) -> None:
+        while self._loaded:
+            self._loaded.popitem()[1].close()
@@ -1,17 +1,22 @@
+import collections as _collections
+import math as _math
 import os as _os
 import random as _random
 import sys as _sys
+import time as _time
 import tkinter as _tk
 import typing as _tp
-from collections import deque as _deque
 from functools import partial as _partial
 from functools import wraps as _wraps
-from tkinter import filedialog as _filedialog
-from tkinter import messagebox as _messagebox
 from tkinter import ttk as _ttk
 
+import animation as _animation
 import config as _config
 import ExMethods as _TkExMethods
+import instrument as _instrument
+import library as _library
+import roster as _roster
+import sampling as _sampling
 
 
 GLOBAL_FONT = "Microsoft YaHei" if _sys.platform == "win32" else ""
@@ -34,16 +39,12 @@ class FontInfo(_tp.NamedTuple):
     row_height: _tp.Optional[int]
 
 
-class NameInfo(_tp.NamedTuple):
-    name: str
-    sex: str
-    state: str
-    remakes: str
+NameInfo = _roster.NameInfo
 
 
 class DrawItem(_tp.NamedTuple):
     item_id: int
-    name_info: NameInfo
+    name_info: _tp.Optional[NameInfo]
 
 
 class DrawNameListEvent(_tp.NamedTuple):
@@ -134,19 +135,23 @@ class NameList(CustomWidget):
         elif not font_info:
             raise TypeError("font_info or font parameters must be selected to pass in.")
 
+        self._row_height = (font_info.row_height) or int(
+            font_info.font_size * 1.4 * self._treeview_style.tk.call("tk", "scaling")
+        )
         self._treeview_style.configure(
             style="Namelist.Treeview",
-            rowheight=(font_info.row_height)
-            or int(
-                font_info.font_size
-                * 1.4
-                * self._treeview_style.tk.call("tk", "scaling")
-            ),
+            rowheight=self._row_height,
             font=(font_info.font, font_info.font_size),
         )
 
         self._font_info = font_info
 
+    def yview(self) -> tuple[float, float]:
+        return self._treeview.yview()
+
+    def yview_moveto(self, __fraction: float, /) -> None:
+        self._treeview.yview_moveto(__fraction)
+
     def adapt_touch_screen(self) -> None:
         self._touch_pointer_y = self._touch_treeview_height = 0
         self._touch_original_fraction = 0.0
@@ -159,11 +164,11 @@ class NameList(CustomWidget):
                 self._touch_pointer_y - event.y
             ) / self._touch_treeview_height
             fraction = self._touch_original_fraction + pointer_fraction
-            self._treeview.yview_moveto(fraction)
+            self.yview_moveto(fraction)
 
         def _mouse_press(event: _tk.Event) -> None:
             self._touch_pointer_y = event.y
-            self._touch_original_fraction = self._treeview.yview()[0]
+            self._touch_original_fraction = self.yview()[0]
             self._touch_treeview_height = self._treeview.winfo_height()
             self._treeview.bind("<Motion>", _mouse_move)
 
@@ -180,14 +185,14 @@ class NameList(CustomWidget):
 
 
 class DrawNameList(NameList):
-    MALE = "男"
-    FEMALE = "女"
-    EN = "英语"
-    JP = "日语"
-    NONE = "无备注"
-    NOT_DRAWN = "未抽过"
-    DRAWN = "已抽过"
-    DELETED = "已删除"
+    MALE = _roster.MALE
+    FEMALE = _roster.FEMALE
+    EN = _roster.EN
+    JP = _roster.JP
+    NONE = _roster.NONE
+    NOT_DRAWN = _roster.NOT_DRAWN
+    DRAWN = _roster.DRAWN
+    DELETED = _roster.DELETED
 
     FLAGS_MALE = MALE
     FLAGS_FEMALE = FEMALE
@@ -212,12 +217,48 @@ class DrawNameList(NameList):
     OPTIONS_REMAKES = _tp.Literal["英语", "日语", "无备注"]
     OPTIONS_EVENT = _tp.Literal["load", "clear", "reset"]
 
-    def __init__(self, master: _tk.Misc) -> None:
-        """Namelist."""
+    IMPORT_CHUNK_SIZE = 500
+    IMPORT_TICK_INTERVAL = 1
+    IMPORT_MAX_REPORTED_ISSUES = 20
+
+    VIRTUAL_OVERSCAN = 2
+
+    def __init__(
+        self,
+        master: _tk.Misc,
+        roster: _tp.Optional[_roster.Roster] = None,
+        virtual: bool = False,
+    ) -> None:
+        """Namelist, a view of the roster which owns the data.
+
+        In virtual mode only the visible rows (plus a small overscan) exist as
+        Treeview items, they are recycled from the roster when scrolling.
+        """
         super().__init__(
             master=master, headings=dict(name="名字", sex="性别", state="状态", remakes="备注")
         )
         self._callbacks: list[DrawNameListEvent] = []
+        self._roster = _roster.Roster() if roster is None else roster
+        self._roster.subscribe(self._roster_changed)
+
+        self._virtual = virtual
+        self._virtual_offset = 0
+        self._virtual_slots: list[str] = []
+        self._virtual_slot_rows: list[_tp.Optional[int]] = []
+        self._virtual_slot_values: list[tuple[str, ...]] = []
+        self._virtual_selected_row: _tp.Optional[int] = None
+        self._virtual_refresh_pending = False
+        if virtual:
+            self._treeview.configure(yscrollcommand="")
+            self._treeview_scrollbar.configure(command=self._virtual_scroll)
+            self._treeview.bind("<Configure>", self._virtual_resize)
+            self._treeview.bind("<<TreeviewSelect>>", self._virtual_select)
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self._treeview.bind(sequence, self._virtual_wheel)
+
+        self._import_reader: _tp.Optional[_roster.NamelistReader] = None
+        self._import_chunks: _tp.Optional[_tp.Iterator[list[NameInfo]]] = None
+        self._import_progress: _tp.Optional[_ttk.Progressbar] = None
 
     @staticmethod
     def join(__info: NameInfo, /) -> str:
@@ -225,17 +266,118 @@ class DrawNameList(NameList):
 
     @staticmethod
     def split(__iteminfo: str, /) -> NameInfo:
-        return NameInfo(*__iteminfo.split("-"))
+        return NameInfo(*__iteminfo.rsplit("-", 3))
+
+    @property
+    def roster(self) -> _roster.Roster:
+        return self._roster
 
     @property
     def treeview_items(self) -> list[NameInfo]:
-        return [self.get_info(i) for i in self.treeview_children]
+        return self._roster.items()
+
+    @property
+    def importing(self) -> bool:
+        return self._import_chunks is not None
 
     @property
     def selected_item(self) -> _tp.Optional[str]:
-        if items := self.selected_items:
+        if self._virtual:
+            if self._virtual_selected_row in self._roster:
+                return str(self._virtual_selected_row)
+        elif items := self.selected_items:
             return items[0]
 
+    @property
+    def virtual_visible_rows(self) -> int:
+        return max(1, self._treeview.winfo_height() // self._row_height)
+
+    def yview(self) -> tuple[float, float]:
+        if not self._virtual:
+            return super().yview()
+
+        if not (total := len(self._roster)):
+            return (0.0, 1.0)
+        first = self._virtual_offset / total
+        return (first, min(1.0, first + self.virtual_visible_rows / total))
+
+    def yview_moveto(self, __fraction: float, /) -> None:
+        if not self._virtual:
+            return super().yview_moveto(__fraction)
+        self._virtual_move(int(__fraction * len(self._roster)))
+
+    def _virtual_move(self, __offset: int, /) -> None:
+        max_offset = max(0, len(self._roster) - self.virtual_visible_rows)
+        offset = min(max(0, __offset), max_offset)
+        if offset != self._virtual_offset:
+            self._virtual_offset = offset
+            self._virtual_refresh()
+
+    def _virtual_scroll(self, action: str, *args: str) -> None:
+        if action == _tk.MOVETO:
+            self.yview_moveto(float(args[0]))
+        elif action == _tk.SCROLL:
+            number, what = int(args[0]), args[1]
+            if what == _tk.PAGES:
+                number *= self.virtual_visible_rows
+            self._virtual_move(self._virtual_offset + number)
+
+    def _virtual_wheel(self, event: _tk.Event) -> str:
+        if event.num == 4 or event.delta > 0:
+            self._virtual_move(self._virtual_offset - 3)
+        elif event.num == 5 or event.delta < 0:
+            self._virtual_move(self._virtual_offset + 3)
+        return "break"
+
+    def _virtual_resize(self, _: _tp.Optional[_tk.Event] = None) -> None:
+        slots_count = self.virtual_visible_rows + self.VIRTUAL_OVERSCAN
+        while len(self._virtual_slots) < slots_count:
+            self._virtual_slots.append(
+                self._treeview.insert("", _tk.END, "slot%d" % len(self._virtual_slots))
+            )
+            self._virtual_slot_rows.append(None)
+            self._virtual_slot_values.append(())
+        self._virtual_move(self._virtual_offset)
+        self._virtual_refresh()
+
+    def _virtual_select(self, _: _tp.Optional[_tk.Event] = None) -> None:
+        if items := self.selected_items:
+            slot_index = self._virtual_slots.index(items[0])
+            self._virtual_selected_row = self._virtual_slot_rows[slot_index]
+
+    def _virtual_schedule_refresh(self) -> None:
+        if not self._virtual_refresh_pending:
+            self._virtual_refresh_pending = True
+            self._treeview.after_idle(self._virtual_refresh)
+
+    def _virtual_refresh(self) -> None:
+        self._virtual_refresh_pending = False
+        row_ids = self._roster.row_ids
+        total = len(row_ids)
+        self._virtual_offset = min(
+            self._virtual_offset, max(0, total - self.virtual_visible_rows)
+        )
+
+        selected_slot = None
+        for slot_index, slot in enumerate(self._virtual_slots):
+            row_index = self._virtual_offset + slot_index
+            row_id = row_ids[row_index] if row_index < total else None
+            values = tuple(self._roster.get(row_id)) if row_id is not None else ()
+            if self._virtual_slot_values[slot_index] != values:
+                self._treeview.item(slot, values=values)
+                self._virtual_slot_values[slot_index] = values
+            self._virtual_slot_rows[slot_index] = row_id
+            if (row_id is not None) and (row_id == self._virtual_selected_row):
+                selected_slot = slot
+
+        if selected_slot:
+            if self.selected_items != (selected_slot,):
+                self._treeview.selection_set(selected_slot)
+        elif items := self.selected_items:
+            self._treeview.selection_remove(*items)
+
+        self._treeview_scrollbar.set(*self.yview())
+
     @_tp.overload
     def insert_info(self, name_info: NameInfo) -> str:
         ...
@@ -259,12 +401,30 @@ class DrawNameList(NameList):
                 state=kwds["state"],
                 remakes=kwds["language"],
             )
-        elif not kwds:
+        elif not name_info:
             raise TypeError("name_info or name parameters must be selected to pass in.")
 
-        return self._treeview.insert(
-            "", _tk.END, self.join(name_info), values=name_info
-        )
+        return str(self._roster.insert(name_info))
+
+    def _roster_changed(self, change: _roster.RosterChange) -> None:
+        if change.event_type == _roster.EVENT_PICK:
+            return None
+        elif self._virtual:
+            if change.event_type == _roster.EVENT_CLEAR:
+                self._virtual_offset = 0
+            self._virtual_schedule_refresh()
+        elif change.event_type == _roster.EVENT_INSERT:
+            for row_id in change.row_ids:
+                self._treeview.insert(
+                    "", _tk.END, str(row_id), values=self._roster.get(row_id)
+                )
+        elif change.event_type == _roster.EVENT_UPDATE:
+            for row_id in change.row_ids:
+                self._treeview.item(str(row_id), values=self._roster.get(row_id))
+        elif change.event_type == _roster.EVENT_DELETE:
+            self._treeview.delete(*map(str, change.row_ids))
+        elif change.event_type == _roster.EVENT_CLEAR:
+            self.clear_info()
 
     def execute_callback(self, event_type: OPTIONS_EVENT) -> None:
         for cb in self._callbacks:
@@ -282,12 +442,12 @@ class DrawNameList(NameList):
         spec_flags: str,
         info_list: _tp.Optional[list[NameInfo]] = None,
     ) -> list[NameInfo]:
-        if not info_list:
-            info_list = self.treeview_items
+        if info_list is None:
+            return self._roster.select(**{spec_item: spec_flags})
         return [i for i in info_list if getattr(i, spec_item) == spec_flags]
 
     def get_info(self, item: str) -> NameInfo:
-        return NameInfo._make(self._treeview.item(item)["values"])
+        return self._roster.get(int(item))
 
     def get_selected_info(self) -> _tp.Optional[NameInfo]:
         if item := self.selected_item:
@@ -295,7 +455,7 @@ class DrawNameList(NameList):
 
     def modify_selected_info(self, __info: NameInfo, /) -> None:
         if item := self.selected_item:
-            self.modify_specific_item(self.split(item), __info)
+            self._roster.update(int(item), __info)
 
     @_tp.overload
     def modify_specific_item(
@@ -328,57 +488,98 @@ class DrawNameList(NameList):
         else:
             replaced_info = source_info._replace(**kwds)
 
-        source_item_id = self.join(source_info)
-        source_item_index = self._treeview.index(source_item_id)
-
-        self._treeview.delete(source_item_id)
-
-        dest_item_id = self.insert_info(replaced_info)
-        self._treeview.move(dest_item_id, "", source_item_index)
+        if (row_id := self._roster.find(source_info)) is not None:
+            self._roster.update(row_id, replaced_info)
 
     def delete_selected_item(self) -> _tp.Optional[NameInfo]:
         if item := self.selected_item:
-            info = self.get_info(item)
-            self._treeview.delete(item)
-            return info
+            return self._roster.delete(int(item))
 
     def clear_all_item(self) -> None:
-        if items := self.treeview_children:
-            self._treeview.delete(*items)
+        if len(self._roster):
+            self._roster.clear()
             self.execute_callback(self.EVENT_CLEAR)
 
     def load(self, filepath: _tp.Optional[str] = None, dialog: bool = True) -> None:
+        if self._import_chunks is not None:
+            return None
+
         if (not filepath) and (dialog):
+            from tkinter import filedialog as _filedialog
+
             filepath = _filedialog.askopenfilename(
                 filetypes=[("TXT文本文档", "*.txt")], title="选择一个文件"
             )
 
         if (filepath) and (_os.path.exists(filepath)):
-            _rp = {
-                "f": DrawNameList.FEMALE,
-                "m": DrawNameList.MALE,
-                "e": DrawNameList.EN,
-                "j": DrawNameList.JP,
-            }
-            with open(filepath, "rt", encoding="UTF-8") as fp:
-                while (_line := fp.readline().strip()) != "":
-                    _name, _sex, _remakes = _line[:-2], _line[-2], _line[-1]
-                    _sex, _remakes = _rp[_sex], _rp[_remakes]
-                    self.insert_info(
-                        name=_name,
-                        state=DrawNameList.NOT_DRAWN,
-                        sex=_sex,
-                        language=_remakes,
-                    )
-            self.execute_callback(self.EVENT_LOAD)
+            self._import_reader = _roster.NamelistReader(filepath)
+            self._import_chunks = self._import_reader.chunks(self.IMPORT_CHUNK_SIZE)
+            self._import_progress = _ttk.Progressbar(
+                self._frame_root, mode="determinate", maximum=1.0
+            )
+            self._import_progress.place_configure(
+                relx=0.0, rely=1.0, relwidth=1.0, anchor=_tk.SW
+            )
+            self._import_next_chunk()
         else:
             print("The specified file path does not exist.")
 
-    def reset(self) -> None:
-        for i in self.treeview_items:
-            self.modify_specific_item(i, state=self.NOT_DRAWN)
+    @_instrument.PROFILER.span("DrawNameList.import_chunk")
+    def _import_next_chunk(self) -> None:
+        if (chunk := next(self._import_chunks, None)) is not None:
+            self._roster.insert_many(chunk)
+            self._import_progress.configure(value=self._import_reader.progress)
+            self._treeview.after(self.IMPORT_TICK_INTERVAL, self._import_next_chunk)
+            return None
+
+        self._import_progress.destroy()
+        self._import_chunks = None
+        if issues := self._import_reader.issues:
+            from tkinter import messagebox as _messagebox
+
+            _messagebox.showwarning(
+                "导入警告",
+                "已跳过%d行格式错误的内容:\n%s"
+                % (
+                    len(issues),
+                    "\n".join(
+                        "第%d行 %s: %s" % issue
+                        for issue in issues[: self.IMPORT_MAX_REPORTED_ISSUES]
+                    ),
+                ),
+            )
+        self.execute_callback(self.EVENT_LOAD)
+
+    def load_infos(self, __infos: _tp.Iterable[NameInfo], /) -> None:
+        self._roster.insert_many(__infos)
+        self.execute_callback(self.EVENT_LOAD)
+
+    def load_rows(self, __rows: _tp.Iterable[tuple[int, NameInfo]], /) -> None:
+        self._roster.load_rows(__rows)
+        self.execute_callback(self.EVENT_LOAD)
+
+    def set_roster(self, __roster: _roster.Roster, /) -> None:
+        """Show another roster, the previous one is left untouched."""
+        if __roster is self._roster:
+            return None
+
+        self._roster.unsubscribe(self._roster_changed)
+        self._roster = __roster
+        self._roster.subscribe(self._roster_changed)
+
+        if self._virtual:
+            self._virtual_offset = 0
+            self._virtual_selected_row = None
+            self._virtual_refresh()
         else:
-            self.execute_callback(self.EVENT_RESET)
+            self.clear_info()
+            for row_id, info in self._roster.rows():
+                self._treeview.insert("", _tk.END, str(row_id), values=info)
+        self.execute_callback(self.EVENT_LOAD)
+
+    def reset(self) -> None:
+        self._roster.reset(self.NOT_DRAWN)
+        self.execute_callback(self.EVENT_RESET)
 
 
 def NameInfoChanger(
@@ -453,13 +654,50 @@ def NameInfoChanger(
         )
 
 
+def BatchResultShower(
+    master: _tk.Misc,
+    groups: _tp.Sequence[_tp.Sequence[NameInfo]],
+    title: str = "抽取结果",
+    relwidth: float = 0.3,
+    relheight: float = 0.4,
+) -> None:
+    """Show the names of a batch draw, one group per line."""
+    top = _tk.Toplevel()
+    top.wm_withdraw()
+    _TkExMethods.SetWindowPos(window=top, relwidth=relwidth, relheight=relheight)
+    top.wm_transient(master)
+    top.wm_title(title)
+    top.configure(borderwidth=5)
+
+    text = _TkExMethods.ScrolledText(top, relief=_tk.FLAT, font=(GLOBAL_FONT, 14))
+    if len(groups) == 1:
+        lines = [" ".join(info.name for info in groups[0])]
+    else:
+        lines = [
+            "第%d组: %s" % (index, " ".join(info.name for info in group))
+            for index, group in enumerate(groups, 1)
+        ]
+    text.insert(_tk.END, "\n".join(lines))
+    text.configure(state=_tk.DISABLED)
+    text.pack_configure(expand=_tk.YES, fill=_tk.BOTH)
+
+    button_close = _ttk.Button(
+        top, text="关闭", command=top.destroy, default=_tk.ACTIVE
+    )
+    button_close.pack_configure(fill=_tk.X, pady=(5, 0))
+    top.wm_deiconify()
+
+
 class NameListControl(CustomWidget):
     def __init__(
-        self, master: _tk.Misc, namelist: DrawNameList, recyle_namelist: DrawNameList
+        self,
+        master: _tk.Misc,
+        namelist: DrawNameList,
+        get_recyle_namelist: _tp.Callable[[], DrawNameList],
     ) -> None:
-        """Control namelist widget."""
+        """Control namelist widget, the recycle list is only built when needed."""
         self._namelist = namelist
-        self._recyle_namelist = recyle_namelist
+        self._get_recyle_namelist = get_recyle_namelist
 
         self._frame_root = self._w = _ttk.Frame(master)
         self._button_add = _ttk.Button(
@@ -513,10 +751,10 @@ class NameListControl(CustomWidget):
 
     def _delete(self) -> None:
         if info := self._namelist.delete_selected_item():
-            self._recyle_namelist.insert_info(info)
+            self._get_recyle_namelist().insert_info(info)
 
     def _restore(self) -> None:
-        if info := self._recyle_namelist.delete_selected_item():
+        if info := self._get_recyle_namelist().delete_selected_item():
             self._namelist.insert_info(info)
 
 
@@ -526,6 +764,11 @@ class InfoShower(CustomWidget):
 
     STATE_COLOR = _tp.Literal["red", "skyblue"]
 
+    TAG_DRAWN = "drawn"
+    TAG_NOT_DRAWN = "not_drawn"
+
+    RESYNC_THRESHOLD = 64
+
     def __init__(self, master: _tk.Misc) -> None:
         """Information shower."""
         self._frame_root = self._w = _ttk.Frame(master)
@@ -549,15 +792,20 @@ class InfoShower(CustomWidget):
             state=_tk.DISABLED,
             font=(GLOBAL_FONT, 11),
         )
-        self._namelist = DrawNameList(self._frame_namelist)
-        self._recyle_nl = DrawNameList(self._frame_recyle_nl)
+        self._text_draw_state.tag_configure(self.TAG_DRAWN, background=self.COLOR_DRAWN)
+        self._text_draw_state.tag_configure(
+            self.TAG_NOT_DRAWN, background=self.COLOR_NOT_DRAWN
+        )
+        self._text_ranges: dict[int, tuple[str, str]] = {}
+        self._namelist = DrawNameList(self._frame_namelist, virtual=True)
+        self._recyle_nl: _tp.Optional[DrawNameList] = None
+        self._recyle_roster: _tp.Optional[_roster.Roster] = None
         self._nl_control = NameListControl(
-            self._frame_root, self._namelist, self._recyle_nl
+            self._frame_root, self._namelist, lambda: self.recyle_namelist
         )
         pack_cnf = dict(expand=_tk.YES, fill=_tk.BOTH)
         self._text_draw_state.pack_configure(cnf=pack_cnf)
         self._namelist.frame.pack_configure(cnf=pack_cnf)
-        self._recyle_nl.frame.pack_configure(cnf=pack_cnf)
 
         self._frame_text.place_configure(relwidth=1.0, relheight=0.45)
         self._frame_namelist.place_configure(
@@ -570,8 +818,10 @@ class InfoShower(CustomWidget):
             relx=0.0, rely=0.9, relwidth=1.0, relheight=0.1
         )
 
+        self._resync_pending = False
+        self._namelist.roster.subscribe(self._roster_changed)
         self._namelist.register_event_callback(
-            DrawNameList.EVENT_LOAD, self.init_state_info
+            DrawNameList.EVENT_LOAD, self._schedule_resync
         )
 
         # Some interal function.
@@ -596,23 +846,55 @@ class InfoShower(CustomWidget):
 
         return _inner
 
-    def _update_names_text_bgcolor(self, *names: str, color: STATE_COLOR) -> None:
-        for n in names:
-            self._text_draw_state.tag_configure(n, background=color)
-
+    def _state_tag(self, __state: str, /) -> str:
+        if __state == DrawNameList.FLAGS_DRAWN:
+            return self.TAG_DRAWN
+        return self.TAG_NOT_DRAWN
+
+    def _update_rows_tag(self, *row_ids: int) -> None:
+        roster = self._namelist.roster
+        for row_id in row_ids:
+            if (text_range := self._text_ranges.get(row_id)) is None:
+                continue
+            tag = self._state_tag(roster.get(row_id).state)
+            other_tag = self.TAG_NOT_DRAWN if tag == self.TAG_DRAWN else self.TAG_DRAWN
+            self._text_draw_state.tag_remove(other_tag, *text_range)
+            self._text_draw_state.tag_add(tag, *text_range)
+
+    def _roster_changed(self, change: _roster.RosterChange) -> None:
+        if (change.event_type == _roster.EVENT_UPDATE) and (
+            len(change.row_ids) <= self.RESYNC_THRESHOLD
+        ):
+            self._update_rows_tag(*change.row_ids)
+        elif (change.event_type != _roster.EVENT_PICK) and (
+            not self._namelist.importing
+        ):
+            self._schedule_resync()
+
+    def _schedule_resync(self) -> None:
+        if not self._resync_pending:
+            self._resync_pending = True
+            self._text_draw_state.after_idle(self.init_state_info)
+
+    @_instrument.PROFILER.span("InfoShower._update_text")
     def _update_text(self) -> None:
-        self._update_names_text_bgcolor(*self.get_drawn_names(), color=self.COLOR_DRAWN)
-        self._update_names_text_bgcolor(
-            *self.get_not_drawn_names(), color=self.COLOR_NOT_DRAWN
-        )
-
-    def _prep_name_text_tags(self, names: _tp.Iterable[str]) -> None:
+        roster = self._namelist.roster
+        ranges: dict[str, list[str]] = {self.TAG_DRAWN: [], self.TAG_NOT_DRAWN: []}
+        for row_id, text_range in self._text_ranges.items():
+            ranges[self._state_tag(roster.get(row_id).state)].extend(text_range)
+
+        for tag, indexes in ranges.items():
+            self._text_draw_state.tag_remove(tag, 1.0, _tk.END)
+            if indexes:
+                self._text_draw_state.tag_add(tag, *indexes)
+
+    def _prep_text_ranges(self, rows: _tp.Iterable[tuple[int, NameInfo]]) -> None:
+        self._text_ranges.clear()
         row_index = 1
         start_column_index = 0
-        for n in names:
-            end_column_index = start_column_index + len(n)
-            self._text_draw_state.tag_add(
-                n,
+        for row_id, info in rows:
+            end_column_index = start_column_index + len(info.name)
+            self._text_ranges[row_id] = (
                 "%d.%d" % (row_index, start_column_index),
                 "%d.%d" % (row_index, end_column_index),
             )
@@ -622,24 +904,24 @@ class InfoShower(CustomWidget):
     def _init_state_info(self) -> None:
         if self._text_draw_state.get(0.0, _tk.END):
             self._text_draw_state.delete(0.0, _tk.END)
-        if self._text_draw_state.tag_names():
-            self._text_draw_state.tag_delete(_tk.ALL)
 
-        names = [info.name for info in self._namelist.treeview_items]
-        self._text_draw_state.insert(_tk.END, " ".join(names))
+        rows = tuple(self._namelist.roster.rows())
+        self._text_draw_state.insert(_tk.END, " ".join(info.name for _, info in rows))
 
-        self._prep_name_text_tags(names)
-        self._update_names_text_bgcolor(*names, color=self.COLOR_NOT_DRAWN)
+        self._prep_text_ranges(rows)
+        self._update_text()
 
+    @_instrument.PROFILER.span("InfoShower._update_state")
     @_modify_text
     def _update_state(
         self,
         *info: NameInfo,
         state: DrawNameList.OPTIONS_STATE = DrawNameList.FLAGS_DRAWN,
     ) -> None:
-        for i in info:
-            self._namelist.modify_specific_item(i, state=state)
-        self._update_text()
+        roster = self._namelist.roster
+        roster.set_state_many(
+            (row_id for i in info if (row_id := roster.find(i)) is not None), state
+        )
 
     @_tp.overload
     def update_state(
@@ -652,7 +934,15 @@ class InfoShower(CustomWidget):
     def update_state(self, *args, **kwargs) -> None:
         return self._update_state(*args, **kwargs)
 
+    def update_rows_state(
+        self,
+        *row_ids: int,
+        state: DrawNameList.OPTIONS_STATE = DrawNameList.FLAGS_DRAWN,
+    ) -> None:
+        self._namelist.roster.set_state_many(row_ids, state)
+
     def init_state_info(self) -> None:
+        self._resync_pending = False
         return self._init_state_info()
 
     @property
@@ -661,8 +951,24 @@ class InfoShower(CustomWidget):
 
     @property
     def recyle_namelist(self) -> DrawNameList:
+        if self._recyle_nl is None:
+            self._recyle_nl = DrawNameList(
+                self._frame_recyle_nl, self._recyle_roster, virtual=True
+            )
+            self._recyle_nl.frame.pack_configure(expand=_tk.YES, fill=_tk.BOTH)
         return self._recyle_nl
 
+    def set_rosters(
+        self, __roster: _roster.Roster, __recyle_roster: _roster.Roster, /
+    ) -> None:
+        """Switch both lists to another class, the recycle list stays lazy."""
+        self._namelist.roster.unsubscribe(self._roster_changed)
+        __roster.subscribe(self._roster_changed)
+        self._recyle_roster = __recyle_roster
+        if self._recyle_nl is not None:
+            self._recyle_nl.set_roster(__recyle_roster)
+        self._namelist.set_roster(__roster)
+
 
 class DrawOptions(CustomWidget):
     def __init__(self, master: _tk.Misc) -> None:
@@ -705,69 +1011,70 @@ class Drawer(CustomWidget):
     MESSAGE_NOT_ITEM_DRAW = "not_item_draw"
     MESSAGE_ALL_ITEMS_DRAWN = "all_items_drawn"
 
+    SPEC_SEX_FLAGS = _roster.SPEC_SEX_FLAGS
+    SPEC_REMAKES_FLAGS = _roster.SPEC_REMAKES_FLAGS
+
     def __init__(
         self,
         namelist: DrawNameList,
         info_shower: InfoShower,
         default_font: str = GLOBAL_FONT,
         callback: _tp.Optional[_tp.Callable[[], None]] = None,
+        engine: _tp.Optional[_sampling.SamplingEngine] = None,
     ) -> None:
         self._callback = callback
         self._namelist = namelist
         self._info_shower = info_shower
         self._default_font = default_font
+        self._engine = engine or _sampling.UniformEngine()
 
         self._start_signal = False
         self._reason = None
 
     @property
     def not_draw_list(self) -> list[NameInfo]:
-        return self._namelist.get_specific_info(
-            self._namelist.ITEM_STATE, self._namelist.FLAGS_NOT_DRAWN
-        )
+        return self._namelist.roster.select(state=self._namelist.FLAGS_NOT_DRAWN)
 
     @property
     def reason(self) -> str:
         return self._reason
 
-    def prep_name_info(self) -> list[NameInfo]:
-        filtered_list = self.not_draw_list
-        print("NOT DRAW LIST:", filtered_list)
-        spec_sex, spec_remakes = (
-            _config.CFG_TKVAR_SPEC_SEX.get(),
-            _config.CFG_TKVAR_SPEC_REMAKES.get(),
+    def filter_criteria(self) -> dict[str, str]:
+        return _roster.filter_criteria(
+            _config.CFG_TKVAR_SPEC_SEX.get(), _config.CFG_TKVAR_SPEC_REMAKES.get()
         )
 
-        if spec_sex != _config.CS_NONE:
-            filter_sex = _partial(
-                self._namelist.get_specific_info, DrawNameList.ITEM_SEX
-            )
-            if spec_sex == _config.CS_SPEC_SEX_MALE:
-                filtered_list = filter_sex(DrawNameList.FLAGS_MALE)
-            elif spec_sex == _config.CS_SPEC_SEX_FEMALE:
-                filtered_list = filter_sex(DrawNameList.FLAGS_FEMALE)
-
-        if spec_remakes != _config.CS_NONE:
-            filter_remakes = _partial(
-                self._namelist.get_specific_info, DrawNameList.ITEM_REMAKES
-            )
-            if spec_remakes == _config.CS_SPEC_TYPE_EN:
-                filtered_list = filter_remakes(DrawNameList.FLAGS_EN, filtered_list)
-            elif spec_remakes == _config.CS_SPEC_TYPE_JP:
-                filtered_list = filter_remakes(DrawNameList.FLAGS_JP, filtered_list)
-            elif spec_remakes == _config.CS_SPEC_TYPE_NOREMAKES:
-                filtered_list = filter_remakes(DrawNameList.FLAGS_NONE, filtered_list)
+    def prep_name_info(self) -> list[NameInfo]:
+        return self._namelist.roster.select(**self.filter_criteria())
+
+    @property
+    def engine(self) -> _sampling.SamplingEngine:
+        return self._engine
 
-        return filtered_list
+    def set_engine(self, __engine: _sampling.SamplingEngine, /) -> None:
+        self._engine = __engine
+
+    def candidates(self) -> _tp.Collection[int]:
+        return self._namelist.roster.candidates(**self.filter_criteria())
+
+    def choose_id(self) -> _tp.Optional[int]:
+        if candidates := self.candidates():
+            return self._engine.pick(candidates, self._namelist.roster.next_rng())
+
+    def choose(self) -> _tp.Optional[NameInfo]:
+        if (row_id := self.choose_id()) is not None:
+            return self._namelist.roster.get(row_id)
 
     def can_draw(self, notify: bool = True) -> bool:
+        from tkinter import messagebox as _messagebox
+
         result = True
-        if not self._namelist.treeview_items:
+        if not len(self._namelist.roster):
             if notify:
                 _messagebox.showwarning("警告", "当前无项目可抽取!")
             self._reason = self.MESSAGE_NOT_ITEM_DRAW
             result = False
-        elif not self.not_draw_list:
+        elif not self._namelist.roster.count(state=self._namelist.FLAGS_NOT_DRAWN):
             if notify:
                 _messagebox.showwarning("警告", "当前所有项目均已抽取!")
             self._reason = self.MESSAGE_ALL_ITEMS_DRAWN
@@ -781,12 +1088,39 @@ class Drawer(CustomWidget):
     def drawing(self) -> bool:
         return self._start_signal
 
-    def done(self, __name_info: NameInfo, /) -> None:
-        self._info_shower.update_state(__name_info)
+    def done(self, __name_info: NameInfo, /, row_id: _tp.Optional[int] = None) -> None:
+        roster = self._namelist.roster
+        if row_id is None:
+            row_id = roster.find(__name_info)
+        if row_id is not None:
+            roster.record_picks((row_id,))
+            self._info_shower.update_rows_state(row_id)
 
         if self._callback:
             self._callback()
 
+    def done_many(self, __row_ids: _tp.Sequence[int], /) -> None:
+        """Commit a batch of picks with one state update."""
+        self._namelist.roster.record_picks(__row_ids)
+        self._info_shower.update_rows_state(*__row_ids)
+
+        if self._callback:
+            self._callback()
+
+    def draw_many(self, __count: int, /) -> list[NameInfo]:
+        row_ids = self._engine.pick_many(
+            self.candidates(), __count, self._namelist.roster.next_rng()
+        )
+        self.done_many(row_ids)
+        return [self._namelist.roster.get(i) for i in row_ids]
+
+    def draw_groups(self, __group_size: int, /) -> list[list[NameInfo]]:
+        groups = _sampling.partition(
+            self.candidates(), __group_size, self._namelist.roster.next_rng()
+        )
+        self.done_many([i for g in groups for i in g])
+        return [[self._namelist.roster.get(i) for i in g] for g in groups]
+
     def stop(self) -> None:
         if self._start_signal:
             self._start_signal = False
@@ -805,80 +1139,86 @@ class OneTextDrawer(Drawer):
         max_interval: int = 1000,
         callback: _tp.Optional[_tp.Callable[[], None]] = None,
     ) -> None:
-        super().__init__(namelist, info_shower, callback)
+        """One label flashing names, driven by the monotonic clock.
+
+        The winner is drawn when the spin starts and the whole spin is laid out
+        by `animation.SpinSchedule`, each frame only looks up its name, so a
+        spin takes the same time however busy the event loop is.
+        """
+        super().__init__(namelist, info_shower, callback=callback)
         self._label = self._w = _ttk.Label(
             master, anchor=_tk.CENTER, justify=_tk.CENTER, font=(GLOBAL_FONT, 80)
         )
 
-        self._get_nameinfo = None
+        # Animation timing and the names flashing by come from their own stream,
+        # so they never shift the roster's draw stream.
+        self._jitter = _random.Random()
         self._update_interval = update_interval
         self._max_update_interval = max_interval
+        self._scheduler = _animation.FrameScheduler(
+            self._label, self.draw, name="one_text"
+        )
 
-        self._update_interval_2 = 0
-        self._max_update_interval_2 = 0
-
-    def nameinfo_generator(
-        self,
-    ) -> _tp.Generator[_tp.Optional[NameInfo], list[NameInfo], None]:
-        name_info_list: list[NameInfo] = yield
-        _random.shuffle(name_info_list)
-
-        while True:
-            for info in name_info_list:
-                if n := (yield info):
-                    break
-            if n:
-                name_info_list = n
-
-            _random.shuffle(name_info_list)
-
-    def update_text(self, __last: bool = False, /) -> None:
-        nameinfo = next(self._get_nameinfo)
-        self._label.configure(text=nameinfo.name)
-        self._label.update_idletasks()
-        if __last:
-            self.done(nameinfo)
-
-    def draw(self) -> None:
-        if not self._start_signal:
-            self._update_interval_2 = min(
-                self._max_update_interval_2,
-                self._update_interval_2
-                + _random.randint(self._update_interval, self._update_interval * 4),
-            )
-            if self._update_interval_2 == self._max_update_interval_2:
-                self._label.after(self._max_update_interval, self.update_text, True)
-                return None
-
-        if (self._update_interval_2 != self._update_interval) and (self._start_signal):
-            self._update_interval_2 = max(
-                self._update_interval,
-                self._update_interval_2 - _random.randint(2, self._update_interval),
-            )
+        self._schedule: _tp.Optional[_animation.SpinSchedule[int]] = None
+        self._started_at = 0.0
+        self._stopped: _tp.Optional[float] = None
+        self._shown_row: _tp.Optional[int] = None
 
-        self.update_text()
-        self._label.after(self._update_interval_2, self.draw)
+    @property
+    def schedule(self) -> _tp.Optional[_animation.SpinSchedule[int]]:
+        return self._schedule
+
+    def update_text(self, __row_id: int, /) -> None:
+        roster = self._namelist.roster
+        if (__row_id != self._shown_row) and (__row_id in roster):
+            self._shown_row = __row_id
+            self._label.configure(text=roster.get(__row_id).name)
+
+    @_instrument.PROFILER.span("Drawer.draw")
+    def draw(self, __now: _tp.Optional[float] = None, /) -> None:
+        elapsed = (_time.monotonic() if __now is None else __now) - self._started_at
+        self.update_text(self._schedule.name_at(elapsed, self._stopped))
+        if self._schedule.finished(elapsed, self._stopped):
+            self._scheduler.stop_loop()
+            if (row_id := self._schedule.winner) in self._namelist.roster:
+                self.done(self._namelist.roster.get(row_id), row_id=row_id)
+            elif self._callback:
+                self._callback()
 
     def start(self) -> bool:
-        if (self._start_signal) or (name_info_list := self.not_draw_list):
+        if (self._start_signal) or ((winner := self.choose_id()) is None):
             self.stop()
             return False
 
-        if not self._get_nameinfo:
-            self._get_nameinfo = self.nameinfo_generator()
-            next(self._get_nameinfo)
-
-        self._get_nameinfo.send(name_info_list)
-        self._start_signal = True
-        self._update_interval_2 = self._update_interval * 10
-        self._max_update_interval_2 = _random.randint(
-            self._update_interval_2 * 2, self._max_update_interval
+        candidates = self.candidates()
+        if not isinstance(candidates, _roster.RowPool):
+            candidates = _roster.RowPool(candidates)
+        self._schedule = _animation.SpinSchedule(
+            winner,
+            lambda: candidates.sample(self._jitter),
+            self._jitter,
+            self._update_interval,
+            self._max_update_interval,
         )
-        self.draw()
+        self._start_signal = True
+        self._started_at = _time.monotonic()
+        self._stopped = None
+        self._shown_row = None
+        self._scheduler.start_loop()
         return True
 
+    def stop(self) -> None:
+        if self._start_signal:
+            self._stopped = _time.monotonic() - self._started_at
+        super().stop()
+
 
 class DiskDrawer(Drawer):
+    FLING_MIN_VELOCITY = 300.0
+    FLING_FRICTION = 2.5
+    VELOCITY_WINDOW = 0.1
+    SETTLE_DISTANCE = 0.5
+
     def __init__(
         self,
         master: _tk.Misc,
@@ -887,6 +1227,13 @@ class DiskDrawer(Drawer):
         default_font: str = GLOBAL_FONT,
         callback: _tp.Optional[_tp.Callable[[], None]] = None,
     ) -> None:
+        """Disk drawer, a ring of names scrolled by dragging.
+
+        Only a fixed pool of canvas text items exists, they are rebound to
+        names from the candidate list as the disk scrolls. Releasing a fast
+        drag flings the disk, it slows down by friction (speeds in px/s) and
+        lands on a name drawn by the engine when the fling starts.
+        """
         super().__init__(info_shower.namelist, info_shower, default_font, callback)
         self._canvas = self._w = _tk.Canvas(master=master)
 
@@ -897,10 +1244,29 @@ class DiskDrawer(Drawer):
         self._text_relative_interval = 0.25
         self._canvas_width = self._canvas_height = 0
         self._pointer_x = 0
-        self._original_x = 0
-
-        self._showing_items: _deque[DrawItem] = _deque()
-        self._hidden_items: _deque[DrawItem] = _deque()
+        self._motion_x = 0
+        self._original_x = 0.0
+        self._scroll_x = 0.0
+        self._layout_scheduler = _animation.FrameScheduler(
+            self._canvas, self._layout_frame, name="disk"
+        )
+        self._fling_scheduler = _animation.FrameScheduler(
+            self._canvas, self._fling_frame, name="disk_fling"
+        )
+        self._motion_samples: _collections.deque[tuple[float, int]]
+        self._motion_samples = _collections.deque(maxlen=16)
+        self._fling_started_at = 0.0
+        self._fling_from = self._fling_to = 0.0
+        self._fling_rate = 0.0
+        self._fling_winner: _tp.Optional[int] = None
+
+        self._candidates: list[int] = []
+        self._pool_size = int(1.0 / self._text_relative_interval) + 2
+        self._pool: list[DrawItem] = []
+        self._pool_index: list[_tp.Optional[int]] = []
+        self._pool_x: list[_tp.Optional[float]] = []
+        self._item_font_size: dict[int, int] = {}
+        self._font_cache = _TkExMethods.FontCache(self._canvas, default_font)
 
         self._canvas.bind("<Configure>", self._update_canvas_info)
         self._canvas.bind("<ButtonPress-1>", self._mouse_press)
@@ -910,6 +1276,21 @@ class DiskDrawer(Drawer):
             DrawNameList.EVENT_LOAD, self.prepare_show_text
         )
 
+    @property
+    def text_spacing(self) -> float:
+        return self._canvas_width * self._text_relative_interval
+
+    @property
+    def current_row_id(self) -> _tp.Optional[int]:
+        if self._candidates and (spacing := self.text_spacing):
+            index = round((self._canvas_center_position - self._scroll_x) / spacing)
+            return self._candidates[index % len(self._candidates)]
+
+    @property
+    def current_name_info(self) -> _tp.Optional[NameInfo]:
+        if (row_id := self.current_row_id) is not None:
+            return self._namelist.roster.get(row_id)
+
     def _compute_text_scaling(self, __text_x: _tp.Union[int, float], /) -> float:
         if self._canvas_center_position == 0:
             self._update_canvas_info()
@@ -924,110 +1305,239 @@ class DiskDrawer(Drawer):
         return font_scaling
 
     def _mouse_press(self, event: _tk.Event) -> None:
-        self._pointer_x = event.x
-        self._original_x = self._canvas.coords("text")[0]
+        if self._fling_scheduler.looping:
+            self._fling_scheduler.stop_loop()
+            self._start_signal = False
+        self._pointer_x = self._motion_x = event.x
+        self._original_x = self._scroll_x
+        self._motion_samples.clear()
+        self._motion_samples.append((_time.monotonic(), event.x))
 
         self._canvas.bind("<Motion>", self._mouse_motion)
 
     def _mouse_motion(self, event: _tk.Event) -> None:
-        self._canvas.moveto("text", self._original_x + (event.x - self._pointer_x))
-        self._update_show_text()
+        self._motion_x = event.x
+        self._motion_samples.append((_time.monotonic(), event.x))
+        self._layout_scheduler.request()
 
     def _mouse_release(self, event: _tk.Event) -> None:
         self._canvas.unbind("<Motion>")
-        self._original_x = self._canvas.coords("text")[0]
+        self._motion_x = event.x
+        self._motion_samples.append((_time.monotonic(), event.x))
+        self._layout_scheduler.cancel()
+        self._layout_frame()
+        self._original_x = self._scroll_x
+
+        if abs(velocity := self.release_velocity()) >= self.FLING_MIN_VELOCITY:
+            self.fling(velocity)
+
+    def _layout_frame(self, _: _tp.Optional[float] = None) -> None:
+        self._scroll_x = self._original_x + (self._motion_x - self._pointer_x)
+        self._update_show_text()
+
+    def release_velocity(self) -> float:
+        """Pointer speed over the last `VELOCITY_WINDOW` s of the drag."""
+        if not self._motion_samples:
+            return 0.0
+        end_time, end_x = self._motion_samples[-1]
+        start_time, start_x = end_time, end_x
+        for sample_time, sample_x in reversed(self._motion_samples):
+            if end_time - sample_time > self.VELOCITY_WINDOW:
+                break
+            start_time, start_x = sample_time, sample_x
+        if end_time - start_time <= 0:
+            return 0.0
+        return (end_x - start_x) / (end_time - start_time)
+
+    def fling(self, __velocity: float, /) -> bool:
+        """Spin the disk at `__velocity` px/s and land on the drawn name.
+
+        The winner comes from the engine and the roster draw stream, like any
+        other draw. Speed decays exponentially, the decay rate is adjusted so
+        the disk comes to rest on the name slot nearest to where friction alone
+        would stop it. The winner is swapped into that slot of the ring while
+        it is off screen, the slot is moved on in the direction of travel if it
+        is shown, so the names on screen never change under the user. A ring
+        shorter than the pool has no hidden slot and may change a shown name.
+        Positions are a closed form of the time since the release, not
+        accumulated per frame.
+        """
+        if self._start_signal or not self.can_draw(notify=False):
+            return False
+        if not (spacing := self.text_spacing):
+            return False
+        if (winner := self.choose_id()) is None:
+            return False
+
+        center = self._canvas_center_position
+        start = self._scroll_x
+        step = int(_math.copysign(1, __velocity))
+        rest = start + __velocity / self.FLING_FRICTION
+        index = round((center - rest) / spacing)
+        if (center - index * spacing - start) * __velocity <= 0:
+            index -= step
+        index = self._place_winner(winner, index, step)
+        target = center - index * spacing
+
+        self._fling_winner = winner
+        self._fling_from, self._fling_to = start, target
+        self._fling_rate = __velocity / (target - start)
+        self._fling_started_at = _time.monotonic()
+        self._start_signal = True
+        self._fling_scheduler.start_loop()
+        return True
+
+    def _place_winner(self, __row_id: int, __index: int, __step: int, /) -> int:
+        """Put `__row_id` at ring index `__index` or the next hidden one.
+
+        Indices are walked in the direction of travel, `__step`, until one
+        maps to a ring slot that is not on screen. Returns the landing index.
+        """
+        ring = self._candidates
+        if not ring:
+            ring.append(__row_id)
+        size = len(ring)
+        shown = {i % size for i in self._pool_index if i is not None}
+        for offset in range(size):
+            if (__index - offset * __step) % size not in shown:
+                __index -= offset * __step
+                break
+
+        slot = __index % size
+        if ring[slot] == __row_id:
+            return __index
+        try:
+            current = ring.index(__row_id)
+        except ValueError:
+            current = None
+        if (current is None) or (current in shown):
+            # The winner joined after the ring was taken, or is on screen:
+            # it takes the slot and the row there drops out of the ring.
+            ring[slot] = __row_id
+        else:
+            ring[slot], ring[current] = ring[current], ring[slot]
+        return __index
+
+    def _fling_frame(self, now: float) -> None:
+        elapsed = now - self._fling_started_at
+        remaining = (self._fling_to - self._fling_from) * _math.exp(
+            -self._fling_rate * elapsed
+        )
+        if abs(remaining) < self.SETTLE_DISTANCE:
+            self._scroll_x = self._original_x = self._fling_to
+            self._fling_scheduler.stop_loop()
+            self._update_show_text()
+            self._start_signal = False
+            # The winner may have been deleted while the disk was spinning.
+            if (row_id := self._fling_winner) in self._namelist.roster:
+                self.done(self._namelist.roster.get(row_id), row_id=row_id)
+            elif self._callback:
+                self._callback()
+            return None
+
+        self._scroll_x = self._original_x = self._fling_to - remaining
+        self._update_show_text()
+
+    def stop(self) -> None:
+        if self._fling_scheduler.looping:
+            # Settle right away on the name the fling was heading for.
+            self._fling_started_at = -_math.inf
+        super().stop()
 
     def _update_canvas_info(self, _: _tp.Optional[_tk.Event] = None) -> None:
         self._canvas.update_idletasks()
         self._canvas_center_position = self._canvas.winfo_width() // 2
         self._canvas_width = self._canvas.winfo_width()
         self._canvas_height = self._canvas.winfo_height()
+        if self._pool:
+            self._pool_x = [None] * self._pool_size
+            self._update_show_text()
 
     def _update_text_size(
         self,
         __text_id: _tp.Union[int, str],
-        __text_x: _tp.Optional[int] = None,
+        __text_x: _tp.Optional[float] = None,
         /,
     ) -> None:
-        if not __text_x:
+        if __text_x is None:
             __text_x = self._canvas.coords(__text_id)[0]
 
         font_scaling = self._compute_text_scaling(__text_x)
-        font_size = int(self._max_text_size * font_scaling)
-        self._canvas.itemconfigure(__text_id, font=(self._default_font, font_size))
+        font_size = self._font_cache.quantize(self._max_text_size * font_scaling)
+        if self._item_font_size.get(__text_id) != font_size:
+            self._item_font_size[__text_id] = font_size
+            self._canvas.itemconfigure(
+                __text_id, font=self._font_cache.get(font_size)
+            )
 
-    def _adjust_text(self, *text_ids: int) -> None:
-        if not text_ids:
-            text_ids = (i.item_id for i in self._showing_items)
+    @_instrument.PROFILER.span("DiskDrawer._adjust_text")
+    def _adjust_text(self, *slots: int) -> None:
+        if not slots:
+            slots = range(len(self._pool))
 
-        for i in text_ids:
-            self._update_text_size(i)
+        for slot in slots:
+            if (text_x := self._pool_x[slot]) is not None:
+                self._update_text_size(self._pool[slot].item_id, text_x)
 
+    @_instrument.PROFILER.span("DiskDrawer._update_show_text")
     def _update_show_text(self) -> None:
-        first_text_id, last_text_id = (
-            self._showing_items[0][0],
-            self._showing_items[-1][0],
-        )
-        first_text_x, last_text_x = (
-            (
-                (first_text_real_x := self._canvas.coords(first_text_id)[0])
-                + (first_text_real_x / 2)
-            ),
-            (
-                (last_text_real_x := self._canvas.coords(last_text_id)[0])
-                - (last_text_real_x / 2)
-            ),
-        )
-        print(first_text_x, last_text_x)
-        if first_text_x < 0:
-            self._canvas.itemconfigure(first_text_id, state=_tk.HIDDEN)
-            deleted_info = self._showing_items.popleft()
-            addition_info = self._hidden_items.popleft()
-            self._hidden_items.appendleft(deleted_info)
-            self._canvas.itemconfigure(addition_info.item_id, state=_tk.NORMAL)
-            self._showing_items.append(addition_info)
-
-        if last_text_x > self._canvas_width:
-            self._canvas.itemconfigure(last_text_id, state=_tk.HIDDEN)
-            deleted_info = self._showing_items.pop()
-            addition_info = self._hidden_items.pop()
-            self._hidden_items.append(deleted_info)
-            self._canvas.itemconfigure(addition_info.item_id, state=_tk.NORMAL)
-            self._showing_items.appendleft(addition_info)
-
-        self._adjust_text()
-
-    def prepare_show_text(self) -> None:
-        items = [
-            DrawItem(
-                item_id=self._canvas.create_text(
-                    0,
-                    self._canvas_height * 0.5,
-                    state=_tk.HIDDEN,
-                    text=n.name,
-                    tags="text",
-                ),
-                name_info=n,
+        if not (self._candidates and self._pool and (spacing := self.text_spacing)):
+            return None
+
+        roster = self._namelist.roster
+        first_index = _math.ceil(-self._scroll_x / spacing)
+        moved_slots = []
+        for index in range(first_index, first_index + self._pool_size):
+            slot = index % self._pool_size
+            item = self._pool[slot]
+            text_x = self._scroll_x + index * spacing
+
+            if self._pool_index[slot] != index:
+                row_id = self._candidates[index % len(self._candidates)]
+                # A row deleted since the candidates were taken keeps its slot.
+                name_info = roster.get(row_id) if row_id in roster else item.name_info
+                if name_info != item.name_info:
+                    item = self._pool[slot] = DrawItem(item.item_id, name_info)
+                    self._canvas.itemconfigure(item.item_id, text=name_info.name)
+                self._pool_index[slot] = index
+
+            if self._pool_x[slot] != text_x:
+                self._canvas.coords(item.item_id, text_x, self._canvas_height * 0.5)
+                self._pool_x[slot] = text_x
+                moved_slots.append(slot)
+
+        self._adjust_text(*moved_slots)
+
+    def _prepare_pool(self) -> None:
+        while len(self._pool) < self._pool_size:
+            item_id = self._canvas.create_text(
+                0, self._canvas_height * 0.5, state=_tk.HIDDEN, tags="text"
             )
-            for n in self.prep_name_info()
-        ]
-        self._hidden_items.extend(items)
+            self._pool.append(DrawItem(item_id=item_id, name_info=None))
+            self._pool_index.append(None)
+            self._pool_x.append(None)
+        _instrument.PROFILER.gauge("canvas items", len(self._pool))
 
-        text_x_relpos = 0.0
-        while text_x_relpos <= 1.0:
-            item = self._hidden_items.popleft()
-            self._canvas.itemconfigure(item.item_id, state=_tk.NORMAL)
-            self._showing_items.append(item)
-            self._canvas.moveto(item.item_id, self._canvas_width * text_x_relpos)
-            text_x_relpos += self._text_relative_interval
-
-        self._adjust_text()
+    def prepare_show_text(self) -> None:
+        self._prepare_pool()
+        self._candidates = self._namelist.roster.query(**self.filter_criteria())
+        self._scroll_x = self._original_x = 0.0
+        self._pool_index = [None] * self._pool_size
+        self._pool_x = [None] * self._pool_size
+
+        state = _tk.NORMAL if self._candidates else _tk.HIDDEN
+        self._canvas.itemconfigure("text", state=state)
+        self._update_show_text()
 
     def clear_all(self) -> None:
         if items := self._canvas.find_all():
             self._canvas.delete(*items)
-        self._showing_items.clear()
-        self._hidden_items.clear()
+        self._candidates.clear()
+        self._pool.clear()
+        self._pool_index.clear()
+        self._pool_x.clear()
+        self._item_font_size.clear()
+        _instrument.PROFILER.gauge("canvas items", 0)
 
 
 class DrawControl(CustomWidget):
@@ -1042,8 +1552,14 @@ class DrawControl(CustomWidget):
         self._drawer: DiskDrawer = drawer
         self._frame_root = self._w = _ttk.Frame(master)
 
-        btn_literals = ("开始", "重置", "退出")
-        btn_commands = (self._start_2, namelist.reset, exit_fn)
+        btn_literals = ("开始", "重置", "抽多人", "分组", "退出")
+        btn_commands = (
+            self._start_2,
+            namelist.reset,
+            self._draw_many,
+            self._draw_groups,
+            exit_fn,
+        )
 
         for lt, cmd, idx in zip(btn_literals, btn_commands, range(len(btn_literals))):
             place_kwds = {}
@@ -1064,6 +1580,28 @@ class DrawControl(CustomWidget):
     def _start_2(self) -> None:
         self._drawer.prepare_show_text()
 
+    def _draw_many(self) -> None:
+        from tkinter import simpledialog as _simpledialog
+
+        if self._drawer.drawing() or not self._drawer.can_draw():
+            return None
+        if count := _simpledialog.askinteger(
+            "抽多人", "抽取人数:", parent=self._frame_root, minvalue=1
+        ):
+            if names := self._drawer.draw_many(count):
+                BatchResultShower(self._frame_root, [names])
+
+    def _draw_groups(self) -> None:
+        from tkinter import simpledialog as _simpledialog
+
+        if self._drawer.drawing() or not self._drawer.can_draw():
+            return None
+        if size := _simpledialog.askinteger(
+            "分组", "每组人数:", parent=self._frame_root, minvalue=1
+        ):
+            if groups := self._drawer.draw_groups(size):
+                BatchResultShower(self._frame_root, groups, title="分组结果")
+
     def _start(self) -> None:
         if not self._drawer.drawing():
             if self._drawer.start():
@@ -1085,9 +1623,13 @@ class Settings(CustomWidget):
     def __init__(self, master: _tk.Misc) -> None:
         self._frame_root = self._w = _ttk.Labelframe(master, text="设置")
 
-        label_literals = ("适应触屏:",)
+        label_literals = ("适应触屏:", "公平抽取:")
         rad_btn_literals = ("是", "否")
         rad_btn_values = ("yes", "no")
+        variables = (
+            _config.CFG_TKVAR_SET_ADAPT_SCREEN,
+            _config.CFG_TKVAR_SET_FAIR_DRAW,
+        )
 
         row = column = 0
         for lt in label_literals:
@@ -1095,14 +1637,75 @@ class Settings(CustomWidget):
             lab.grid_configure(row=row, column=column)
             row += 1
 
-        row = 0
-        column = 1
-        var = _config.CFG_TKVAR_SET_ADAPT_SCREEN
-        for lt, val in zip(rad_btn_literals, rad_btn_values):
-            rad = _ttk.Radiobutton(self._frame_root, text=lt, value=val, variable=var)
-            rad.grid_configure(row=row, column=column, sticky=_tk.W)
-            self._frame_root.grid_columnconfigure(column, weight=1)
-            column += 1
+        for row, var in enumerate(variables):
+            column = 1
+            for lt, val in zip(rad_btn_literals, rad_btn_values):
+                rad = _ttk.Radiobutton(
+                    self._frame_root, text=lt, value=val, variable=var
+                )
+                rad.grid_configure(row=row, column=column, sticky=_tk.W)
+                self._frame_root.grid_columnconfigure(column, weight=1)
+                column += 1
+
+
+class RosterSwitcher(CustomWidget):
+    def __init__(
+        self,
+        master: _tk.Misc,
+        get_names: _tp.Callable[[], list[str]],
+        switch: _tp.Callable[[str], bool],
+        create: _tp.Callable[[str], str],
+    ) -> None:
+        """Pick the current class out of the named rosters, or add a new one."""
+        self._frame_root = self._w = _ttk.Labelframe(master, text="班级")
+        self._get_names = get_names
+        self._switch = switch
+        self._create = create
+
+        self._current = _tk.StringVar(self._frame_root)
+        self._shown = ""
+        self._combobox = _ttk.Combobox(
+            self._frame_root,
+            textvariable=self._current,
+            state="readonly",
+            postcommand=self.refresh,
+        )
+        self._combobox.bind("<<ComboboxSelected>>", self._selected)
+        self._new_button = _ttk.Button(self._frame_root, text="新建", command=self._new)
+
+        self._combobox.pack_configure(side=_tk.LEFT, expand=_tk.YES, fill=_tk.X, padx=2)
+        self._new_button.pack_configure(side=_tk.RIGHT, padx=2)
+
+    def refresh(self) -> None:
+        self._combobox.configure(values=self._get_names())
+
+    def set_current(self, __name: str, /) -> None:
+        self._current.set(__name)
+        self._shown = __name
+
+    def _selected(self, _: _tp.Optional[_tk.Event] = None) -> None:
+        if (name := self._current.get()) == self._shown:
+            return None
+        if self._switch(name):
+            self._shown = name
+        else:
+            self._current.set(self._shown)
+
+    def _new(self) -> None:
+        from tkinter import messagebox as _messagebox
+        from tkinter import simpledialog as _simpledialog
+
+        name = _simpledialog.askstring("新建班级", "班级名称:", parent=self._frame_root)
+        if not name:
+            return None
+        try:
+            name = self._create(name)
+        except (ValueError, OSError) as e:
+            _messagebox.showerror("新建失败", str(e), parent=self._frame_root)
+            return None
+        self.refresh()
+        self._current.set(name)
+        self._selected()
 
 
 class Control(CustomWidget):
@@ -1111,12 +1714,14 @@ class Control(CustomWidget):
         master: _tk.Misc,
         info_shower: InfoShower,
         drawer: Drawer,
+        roster_switcher: _tp.Callable[[_tk.Misc], RosterSwitcher],
         exit_func: _tp.Optional[_tp.Callable[[], None]] = None,
     ) -> None:
         self._frame_root = self._w = _ttk.Frame(master)
 
         self._draw_options = DrawOptions(self._frame_root)
         self._settings = Settings(self._frame_root)
+        self._roster_switcher = roster_switcher(self._frame_root)
         self._draw_control = DrawControl(
             self._frame_root, drawer, info_shower._namelist, exit_func
         )
@@ -1125,15 +1730,60 @@ class Control(CustomWidget):
         self._settings.frame.place_configure(
             relx=1.0, relwidth=0.3, relheight=0.25, anchor=_tk.NE
         )
+        self._roster_switcher.frame.place_configure(
+            rely=0.26, relwidth=1.0, relheight=0.12
+        )
         self._draw_control.frame.place_configure(
-            rely=0.26, relwidth=1.0, relheight=0.74
+            rely=0.39, relwidth=1.0, relheight=0.61
+        )
+
+    @property
+    def roster_switcher(self) -> RosterSwitcher:
+        return self._roster_switcher
+
+
+class ProfilerOverlay(CustomWidget):
+    REFRESH_INTERVAL = 500
+
+    def __init__(self, master: _tk.Misc) -> None:
+        """Live profiler summary drawn over the window, toggled with F12."""
+        self._label = self._w = _tk.Label(
+            master,
+            anchor=_tk.NW,
+            justify=_tk.LEFT,
+            font=("TkFixedFont", 9),
+            background="black",
+            foreground="lime",
         )
+        self._refresh_id: _tp.Optional[str] = None
+
+    @property
+    def shown(self) -> bool:
+        return self._refresh_id is not None
+
+    def _refresh(self) -> None:
+        self._label.configure(text=_instrument.PROFILER.summary())
+        self._label.lift()
+        self._refresh_id = self._label.after(self.REFRESH_INTERVAL, self._refresh)
+
+    def toggle(self, _: _tp.Optional[_tk.Event] = None) -> None:
+        if self.shown:
+            self._label.after_cancel(self._refresh_id)
+            self._refresh_id = None
+            self._label.place_forget()
+        else:
+            self._label.place_configure(relx=1.0, rely=0.0, anchor=_tk.NE)
+            self._refresh()
 
 
 class Application(_tk.Tk):
+    AUTOSAVE_POLL_INTERVAL = 1000
+
     def __init__(self, title: str) -> None:
         """Application Class."""
         super().__init__()
+        if _instrument.PROFILER.enabled:
+            self.tk = _instrument.TclCallCounter(self.tk, _instrument.PROFILER)
         self.wm_withdraw()
         _TkExMethods.SetWindowPos(window=self, relwidth=0.75, relheight=0.85, rely=0.3)
         self._style = _ttk.Style(self)
@@ -1144,8 +1794,14 @@ class Application(_tk.Tk):
     def load_config(self) -> None:
         _config.Check()
         _config.Load()
+        self._library = _library.RosterLibrary()
+        self._loaded: _tp.Optional[_library.LoadedRoster] = None
+        self._autosaver = _config.AutoSaver()
+        _instrument.STARTUP.mark("config load")
 
     def exit(self) -> None:
+        self._library.close()
+        self._autosaver.close()
         _config.Save()
         self.quit()
         self.destroy()
@@ -1155,16 +1811,79 @@ class Application(_tk.Tk):
         # self._drawer = OneTextDrawer(self, self._info_shower._namelist)
         self._drawer = DiskDrawer(self, self._info_shower, 80)
         self._control_options = Control(
-            self, self._info_shower, self._drawer, self.exit
+            self,
+            self._info_shower,
+            self._drawer,
+            lambda master: RosterSwitcher(
+                master, self._library.names, self.switch_roster, self._library.create
+            ),
+            self.exit,
         )
 
+        _config.CFG_TKVAR_SET_FAIR_DRAW.trace_add("write", self._update_draw_engine)
+        self._update_draw_engine()
+        for var in (
+            _config.CFG_TKVAR_SPEC_SEX,
+            _config.CFG_TKVAR_SPEC_REMAKES,
+            _config.CFG_TKVAR_SET_ADAPT_SCREEN,
+            _config.CFG_TKVAR_SET_FAIR_DRAW,
+        ):
+            var.trace_add("write", self._request_autosave)
+        self.after(self.AUTOSAVE_POLL_INTERVAL, self._poll_autosave_errors)
+        if _instrument.PROFILER.enabled:
+            self._profiler_overlay = ProfilerOverlay(self)
+            self.bind("<F12>", self._profiler_overlay.toggle)
+
         self._info_shower.frame.place_configure(rely=0.6, relwidth=0.499, relheight=0.4)
         self._drawer.frame.place_configure(relwidth=1.0, relheight=0.6)
         self._control_options.frame.place_configure(
             relx=1.0, rely=0.6, relwidth=0.499, relheight=0.4, anchor=_tk.NE
         )
+        _instrument.STARTUP.mark("gui build")
+
+    def hydrate(self) -> None:
+        """Load the current roster, runs after the window is shown."""
+        if not self.switch_roster(_config.CFG_CURRENT_ROSTER):
+            self.switch_roster(_config.DEFAULT_ROSTER)
+        _instrument.STARTUP.mark("roster hydration")
+        _instrument.STARTUP.print_report()
+
+    def switch_roster(self, __name: str, /) -> bool:
+        """Show another named roster, recently used ones are already loaded."""
+        if self._drawer.drawing() or self._info_shower.namelist.importing:
+            return False
+        try:
+            loaded = self._loaded = self._library.open(__name)
+        except KeyError:
+            return False
+
+        self._info_shower.set_rosters(loaded.names, loaded.deleted)
+        self._update_draw_engine()
+        self._control_options.roster_switcher.set_current(__name)
+        if _config.CFG_CURRENT_ROSTER != __name:
+            _config.CFG_CURRENT_ROSTER = __name
+            self._autosaver.request()
+        return True
+
+    def _request_autosave(self, *_: str) -> None:
+        self._autosaver.request()
+
+    def _poll_autosave_errors(self) -> None:
+        if errors := self._autosaver.poll_errors():
+            from tkinter import messagebox as _messagebox
+
+            _messagebox.showerror("保存失败", "无法保存设置:\n%s" % errors[-1])
+        self.after(self.AUTOSAVE_POLL_INTERVAL, self._poll_autosave_errors)
+
+    def _update_draw_engine(self, *_: str) -> None:
+        if self._loaded is not None:
+            fair = _config.CFG_TKVAR_SET_FAIR_DRAW.get() == "yes"
+            self._drawer.set_engine(self._loaded.engine(fair))
 
     def show(self) -> None:
         self.update()
         self.wm_deiconify()
+        self.update_idletasks()
+        _instrument.STARTUP.mark("first paint")
+        self.after_idle(self.hydrate)
         self.mainloop()
@@ -0,0 +1,554 @@
+import itertools as _itertools
+import os as _os
+import random as _random
+import typing as _tp
+
+import config as _config
+
+MALE = "男"
+FEMALE = "女"
+EN = "英语"
+JP = "日语"
+NONE = "无备注"
+NOT_DRAWN = "未抽过"
+DRAWN = "已抽过"
+DELETED = "已删除"
+
+EVENT_INSERT = "insert"
+EVENT_UPDATE = "update"
+EVENT_DELETE = "delete"
+EVENT_CLEAR = "clear"
+EVENT_PICK = "pick"
+
+OPTIONS_CHANGE = _tp.Literal["insert", "update", "delete", "clear", "pick"]
+
+INDEXED_FIELDS = ("state", "sex", "remakes")
+
+SEX_CODES = {"f": FEMALE, "m": MALE}
+REMAKES_CODES = {"e": EN, "j": JP, "n": NONE}
+
+SPEC_SEX_FLAGS = {_config.CS_SPEC_SEX_MALE: MALE, _config.CS_SPEC_SEX_FEMALE: FEMALE}
+SPEC_REMAKES_FLAGS = {
+    _config.CS_SPEC_TYPE_EN: EN,
+    _config.CS_SPEC_TYPE_JP: JP,
+    _config.CS_SPEC_TYPE_NOREMAKES: NONE,
+}
+
+_DEFAULT_RNG = _random.Random()
+
+
+class NameInfo(_tp.NamedTuple):
+    name: str
+    sex: str
+    state: str
+    remakes: str
+
+
+def filter_criteria(
+    spec_sex: str = _config.CS_NONE, spec_remakes: str = _config.CS_NONE
+) -> dict[str, str]:
+    """Roster criteria for the not-drawn rows matching the config filter values."""
+    criteria = {"state": NOT_DRAWN}
+    if spec_sex in SPEC_SEX_FLAGS:
+        criteria["sex"] = SPEC_SEX_FLAGS[spec_sex]
+    if spec_remakes in SPEC_REMAKES_FLAGS:
+        criteria["remakes"] = SPEC_REMAKES_FLAGS[spec_remakes]
+    return criteria
+
+
+def dump_infos(infos: _tp.Iterable[NameInfo]) -> list[str]:
+    return ["-".join(info) for info in infos]
+
+
+def load_infos(lines: _tp.Iterable[str]) -> list[NameInfo]:
+    return [NameInfo(*line.rsplit("-", 3)) for line in lines]
+
+
+def dump_namelist(infos: _tp.Iterable[NameInfo]) -> list[str]:
+    """Lines in the `namelist.txt` format read by `NamelistReader`."""
+    sex_codes = {v: k for k, v in SEX_CODES.items()}
+    remakes_codes = {v: k for k, v in REMAKES_CODES.items()}
+    return [
+        info.name + sex_codes[info.sex] + remakes_codes[info.remakes]
+        for info in infos
+    ]
+
+
+class RosterChange(_tp.NamedTuple):
+    event_type: str
+    row_ids: tuple[int, ...]
+
+
+class ImportIssue(_tp.NamedTuple):
+    lineno: int
+    line: str
+    reason: str
+
+
+class RngState(_tp.NamedTuple):
+    seed: _tp.Optional[int] = None
+    counter: int = 0
+
+
+class RankIndex(object):
+    def __init__(self, row_ids: _tp.Iterable[int]) -> None:
+        """Fenwick tree of row id counts, finds the k-th smallest id in O(log n).
+
+        The tree spans the ids below a power of two above the largest id given.
+        """
+        row_ids = list(row_ids)
+        size = 1
+        while size <= max(row_ids, default=0):
+            size <<= 1
+        tree = [0] * (size + 1)
+        for row_id in row_ids:
+            tree[row_id + 1] = 1
+        for i in range(1, size + 1):
+            if (parent := i + (i & -i)) <= size:
+                tree[parent] += tree[i]
+        self._size = size
+        self._tree = tree
+
+    def covers(self, __row_id: int, /) -> bool:
+        return __row_id < self._size
+
+    def update(self, __row_id: int, __delta: int, /) -> None:
+        tree, size = self._tree, self._size
+        i = __row_id + 1
+        while i <= size:
+            tree[i] += __delta
+            i += i & -i
+
+    def select(self, __rank: int, /) -> int:
+        tree, position, step = self._tree, 0, self._size
+        while step:
+            if tree[position + step] <= __rank:
+                position += step
+                __rank -= tree[position]
+            step >>= 1
+        return position
+
+
+class RowPool(object):
+    def __init__(self, row_ids: _tp.Iterable[int] = ()) -> None:
+        """Row ids in an array with a position map.
+
+        Add, remove (swap with the last element) and uniform sampling are all
+        O(1), drawing and removing in one step is a partial Fisher-Yates pass.
+        The array order depends on past removals, `select` ranks by row id
+        instead, through a `RankIndex` built on first use.
+        """
+        self._ids: list[int] = []
+        self._positions: dict[int, int] = {}
+        self._ranks: _tp.Optional[RankIndex] = None
+        self._rank_changes: list[tuple[int, int]] = []
+        for row_id in row_ids:
+            self.add(row_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> _tp.Iterator[int]:
+        return iter(self._ids)
+
+    def __contains__(self, __row_id: object, /) -> bool:
+        return __row_id in self._positions
+
+    def _rank_change(self, __row_id: int, __delta: int, /) -> None:
+        # Changes are applied on the next `select`, past about one in sixteen
+        # rows the index is dropped and rebuilt instead.
+        if (len(self._rank_changes) > (len(self._ids) >> 4) + 64) or (
+            not self._ranks.covers(__row_id)
+        ):
+            self._ranks = None
+            self._rank_changes.clear()
+        else:
+            self._rank_changes.append((__row_id, __delta))
+
+    def add(self, __row_id: int, /) -> None:
+        if __row_id not in self._positions:
+            self._positions[__row_id] = len(self._ids)
+            self._ids.append(__row_id)
+            if self._ranks is not None:
+                self._rank_change(__row_id, 1)
+
+    def discard(self, __row_id: int, /) -> None:
+        if (position := self._positions.pop(__row_id, None)) is None:
+            return None
+        last_id = self._ids.pop()
+        if position < len(self._ids):
+            self._ids[position] = last_id
+            self._positions[last_id] = position
+        if self._ranks is not None:
+            self._rank_change(__row_id, -1)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._positions.clear()
+        self._ranks = None
+        self._rank_changes.clear()
+
+    def select(self, __rank: int, /) -> int:
+        """The row id with `__rank` smaller ids in the pool."""
+        if not 0 <= __rank < len(self._ids):
+            raise IndexError("rank out of range.")
+        if self._ranks is None:
+            self._ranks = RankIndex(self._ids)
+        for row_id, delta in self._rank_changes:
+            self._ranks.update(row_id, delta)
+        self._rank_changes.clear()
+        return self._ranks.select(__rank)
+
+    def sample(self, rng: _random.Random = _DEFAULT_RNG) -> int:
+        return self._ids[rng.randrange(len(self._ids))]
+
+    def draw(self, rng: _random.Random = _DEFAULT_RNG) -> int:
+        row_id = self.sample(rng)
+        self.discard(row_id)
+        return row_id
+
+
+def _combined_pool(
+    __index: dict[tuple[str, ...], RowPool],
+    __fields: tuple[str, ...],
+    __values: _tp.Union[NameInfo, dict[str, str]],
+    /,
+) -> RowPool:
+    """Pool of `__index` for the `__fields` of a row or criteria, made if missing."""
+    if isinstance(__values, dict):
+        key = tuple(__values[field] for field in __fields)
+    else:
+        key = tuple(getattr(__values, field) for field in __fields)
+    if (pool := __index.get(key)) is None:
+        pool = __index[key] = RowPool()
+    return pool
+
+
+class Roster(object):
+    def __init__(self, infos: _tp.Iterable[NameInfo] = ()) -> None:
+        """Pure python roster model, rows are keyed by stable integer ids."""
+        self._rows: dict[int, NameInfo] = {}
+        self._order: _tp.Optional[list[int]] = None
+        self._next_id = 0
+        self._listeners: list[_tp.Callable[[RosterChange], None]] = []
+        self._indexes: dict[str, dict[str, RowPool]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        # Pools per value combination of several fields, built on first use.
+        self._combined: dict[tuple[str, ...], dict[tuple[str, ...], RowPool]] = {}
+        self._pick_counts: dict[str, int] = {}
+        self._rng_state = RngState()
+
+        if infos:
+            self.insert_many(infos)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> _tp.Iterator[int]:
+        return iter(self._rows)
+
+    def __contains__(self, __row_id: object, /) -> bool:
+        return __row_id in self._rows
+
+    @property
+    def row_ids(self) -> list[int]:
+        if self._order is None:
+            self._order = list(self._rows)
+        return self._order
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    @property
+    def pick_counts(self) -> dict[str, int]:
+        return self._pick_counts.copy()
+
+    def load_pick_counts(self, __counts: dict[str, int], /) -> None:
+        self._pick_counts = dict(__counts)
+
+    def pick_count(self, __row_id: int, /) -> int:
+        return self._pick_counts.get(self._rows[__row_id].name, 0)
+
+    @property
+    def rng_state(self) -> RngState:
+        return self._rng_state
+
+    def load_rng_state(self, __state: RngState, /) -> None:
+        self._rng_state = RngState(*__state)
+
+    def next_rng(self) -> _random.Random:
+        """Generator for the next draw, derived from the roster seed and counter.
+
+        The counter is saved along with the pick counts so a session resumes
+        the stream. The engines in `sampling` pick by row id order, so a draw
+        is reproducible from `(seed, counter)` given the same rows, states and
+        pick counts, and the same candidate filter.
+        """
+        seed, counter = self._rng_state
+        if seed is None:
+            seed = _random.SystemRandom().getrandbits(63)
+        self._rng_state = RngState(seed, counter + 1)
+        return _random.Random("%d:%d" % (seed, counter))
+
+    def record_picks(self, __row_ids: _tp.Iterable[int], /) -> None:
+        """Count picks per name, they are kept across sessions and imports."""
+        row_ids = tuple(__row_ids)
+        for row_id in row_ids:
+            name = self._rows[row_id].name
+            self._pick_counts[name] = self._pick_counts.get(name, 0) + 1
+        if row_ids:
+            self._notify(EVENT_PICK, row_ids)
+
+    def subscribe(self, __func: _tp.Callable[[RosterChange], None], /) -> None:
+        self._listeners.append(__func)
+
+    def unsubscribe(self, __func: _tp.Callable[[RosterChange], None], /) -> None:
+        if __func in self._listeners:
+            self._listeners.remove(__func)
+
+    def _notify(self, event_type: OPTIONS_CHANGE, row_ids: tuple[int, ...]) -> None:
+        change = RosterChange(event_type, row_ids)
+        for func in tuple(self._listeners):
+            func(change)
+
+    def _new_id(self, row_id: _tp.Optional[int] = None) -> int:
+        if row_id is None:
+            row_id = self._next_id
+        elif row_id in self._rows:
+            raise KeyError("row id %d already exists." % row_id)
+        self._next_id = max(self._next_id, row_id + 1)
+        return row_id
+
+    def _index_add(self, __row_id: int, __info: NameInfo, /) -> None:
+        for field, index in self._indexes.items():
+            if (pool := index.get(value := getattr(__info, field))) is None:
+                pool = index[value] = RowPool()
+            pool.add(__row_id)
+        for fields, index in self._combined.items():
+            _combined_pool(index, fields, __info).add(__row_id)
+
+    def _index_remove(self, __row_id: int, __info: NameInfo, /) -> None:
+        for field, index in self._indexes.items():
+            index[getattr(__info, field)].discard(__row_id)
+        for fields, index in self._combined.items():
+            _combined_pool(index, fields, __info).discard(__row_id)
+
+    def _criteria_pool(self, criteria: dict[str, str]) -> RowPool:
+        fields = tuple(field for field in INDEXED_FIELDS if field in criteria)
+        if len(fields) != len(criteria):
+            unknown = next(field for field in criteria if field not in fields)
+            raise KeyError("field %r is not indexed." % unknown)
+        if (index := self._combined.get(fields)) is None:
+            index = self._combined[fields] = {}
+            for row_id, info in self._rows.items():
+                _combined_pool(index, fields, info).add(row_id)
+        return _combined_pool(index, fields, criteria)
+
+    def _index_pools(self, criteria: dict[str, str]) -> list[_tp.Collection[int]]:
+        pools = []
+        for field, value in criteria.items():
+            if field not in self._indexes:
+                raise KeyError("field %r is not indexed." % field)
+            pools.append(self._indexes[field].get(value, ()))
+        return sorted(pools, key=len)
+
+    def _match(self, criteria: dict[str, str]) -> set[int]:
+        if not criteria:
+            return set(self._rows)
+
+        smallest, *others = self._index_pools(criteria)
+        return {i for i in smallest if all(i in s for s in others)}
+
+    def match(self, **criteria: str) -> set[int]:
+        return self._match(criteria)
+
+    def candidates(self, **criteria: str) -> _tp.Collection[int]:
+        """Like `match` but the rows matching criteria are a live `RowPool`.
+
+        A combination of fields gets its own index on first use, built in O(n)
+        and kept up to date from then on at the cost of one more pool update
+        per changed row for each combination ever asked for.
+        """
+        if not criteria:
+            return self._match(criteria)
+        if len(criteria) == 1:
+            return self._index_pools(criteria)[0]
+        return self._criteria_pool(criteria)
+
+    def query(self, **criteria: str) -> list[int]:
+        """Return the ids of rows matching every `field=value` in roster order."""
+        return sorted(self._match(criteria))
+
+    def select(self, **criteria: str) -> list[NameInfo]:
+        return [self._rows[i] for i in self.query(**criteria)]
+
+    def count(self, **criteria: str) -> int:
+        if len(criteria) == 1:
+            ((field, value),) = criteria.items()
+            return len(self._indexes[field].get(value, ()))
+        return len(self._match(criteria))
+
+    def get(self, __row_id: int, /) -> NameInfo:
+        return self._rows[__row_id]
+
+    def items(self) -> list[NameInfo]:
+        return list(self._rows.values())
+
+    def rows(self) -> _tp.ItemsView[int, NameInfo]:
+        return self._rows.items()
+
+    def index(self, __row_id: int, /) -> int:
+        return self.row_ids.index(__row_id)
+
+    def find(self, __info: NameInfo, /) -> _tp.Optional[int]:
+        for row_id, info in self._rows.items():
+            if info == __info:
+                return row_id
+
+    def insert(self, __info: NameInfo, /, row_id: _tp.Optional[int] = None) -> int:
+        row_id = self._new_id(row_id)
+        self._rows[row_id] = __info
+        self._index_add(row_id, __info)
+        if self._order is not None:
+            self._order.append(row_id)
+        self._notify(EVENT_INSERT, (row_id,))
+        return row_id
+
+    def insert_many(self, __infos: _tp.Iterable[NameInfo], /) -> list[int]:
+        return self.load_rows((None, info) for info in __infos)
+
+    def load_rows(
+        self, __rows: _tp.Iterable[tuple[_tp.Optional[int], NameInfo]], /
+    ) -> list[int]:
+        """Insert rows keeping their ids (e.g. from a journal) in one notification."""
+        row_ids = []
+        for row_id, info in __rows:
+            row_id = self._new_id(row_id)
+            self._rows[row_id] = info
+            self._index_add(row_id, info)
+            row_ids.append(row_id)
+        if row_ids:
+            if self._order is not None:
+                self._order.extend(row_ids)
+            self._notify(EVENT_INSERT, tuple(row_ids))
+        return row_ids
+
+    def update(self, __row_id: int, __info: NameInfo, /) -> None:
+        if (old_info := self._rows[__row_id]) != __info:
+            self._index_remove(__row_id, old_info)
+            self._index_add(__row_id, __info)
+            self._rows[__row_id] = __info
+            self._notify(EVENT_UPDATE, (__row_id,))
+
+    def _set_state(self, __row_id: int, __state: str, /) -> bool:
+        info = self._rows[__row_id]
+        if info.state == __state:
+            return False
+
+        state_index = self._indexes["state"]
+        state_index[info.state].discard(__row_id)
+        if (pool := state_index.get(__state)) is None:
+            pool = state_index[__state] = RowPool()
+        pool.add(__row_id)
+        new_info = self._rows[__row_id] = info._replace(state=__state)
+        for fields, index in self._combined.items():
+            if "state" in fields:
+                _combined_pool(index, fields, info).discard(__row_id)
+                _combined_pool(index, fields, new_info).add(__row_id)
+        return True
+
+    def set_state(self, __row_id: int, __state: str, /) -> None:
+        if self._set_state(__row_id, __state):
+            self._notify(EVENT_UPDATE, (__row_id,))
+
+    def set_state_many(
+        self, __row_ids: _tp.Iterable[int], __state: str, /
+    ) -> tuple[int, ...]:
+        """Change the state of many rows with a single update notification."""
+        changed = tuple(i for i in __row_ids if self._set_state(i, __state))
+        if changed:
+            self._notify(EVENT_UPDATE, changed)
+        return changed
+
+    def reset(self, __state: str = NOT_DRAWN, /) -> tuple[int, ...]:
+        row_ids = [
+            row_id
+            for state, ids in self._indexes["state"].items()
+            if state != __state
+            for row_id in ids
+        ]
+        return self.set_state_many(row_ids, __state)
+
+    def delete(self, __row_id: int, /) -> NameInfo:
+        info = self._rows.pop(__row_id)
+        self._index_remove(__row_id, info)
+        self._order = None
+        self._notify(EVENT_DELETE, (__row_id,))
+        return info
+
+    def clear(self) -> None:
+        if self._rows:
+            row_ids = tuple(self._rows)
+            self._rows.clear()
+            # Pools are emptied in place, the ones handed out stay live.
+            for index in (*self._indexes.values(), *self._combined.values()):
+                for pool in index.values():
+                    pool.clear()
+            self._order = None
+            self._notify(EVENT_CLEAR, row_ids)
+
+
+class NamelistReader(object):
+    def __init__(self, filepath: str, encoding: str = "UTF-8") -> None:
+        """Streaming parser for `namelist.txt` style files.
+
+        Each non-blank line is a name followed by a sex code and a remakes code,
+        e.g. `张三me`. Malformed lines are recorded in `issues` and skipped.
+        """
+        self._filepath = filepath
+        self._encoding = encoding
+        self._size = _os.path.getsize(filepath)
+        self._consumed = 0
+        self.issues: list[ImportIssue] = []
+
+    @property
+    def progress(self) -> float:
+        if not self._size:
+            return 1.0
+        return self._consumed / self._size
+
+    def parse_line(self, __lineno: int, __line: str, /) -> _tp.Optional[NameInfo]:
+        name, sex, remakes = __line[:-2], __line[-2:-1], __line[-1:]
+        if not name:
+            reason = "missing name or codes"
+        elif sex not in SEX_CODES:
+            reason = "unknown sex code %r" % sex
+        elif remakes not in REMAKES_CODES:
+            reason = "unknown remakes code %r" % remakes
+        else:
+            return NameInfo(
+                name=name,
+                sex=SEX_CODES[sex],
+                state=NOT_DRAWN,
+                remakes=REMAKES_CODES[remakes],
+            )
+        self.issues.append(ImportIssue(__lineno, __line, reason))
+
+    def __iter__(self) -> _tp.Iterator[NameInfo]:
+        with open(self._filepath, "rb") as fp:
+            for lineno, raw_line in enumerate(fp, 1):
+                self._consumed += len(raw_line)
+                try:
+                    line = raw_line.decode(self._encoding).strip()
+                except UnicodeDecodeError:
+                    self.issues.append(ImportIssue(lineno, "", "undecodable line"))
+                    continue
+                if line and (info := self.parse_line(lineno, line)):
+                    yield info
+
+    def chunks(self, size: int) -> _tp.Iterator[list[NameInfo]]:
+        infos = iter(self)
+        while chunk := list(_itertools.islice(infos, size)):
+            yield chunk
@@ -0,0 +1,266 @@
+import itertools as _itertools
+import mmap as _mmap
+import os as _os
+import struct as _struct
+import typing as _tp
+
+import roster as _roster
+
+MAGIC = b"RCSN"
+VERSION = 3
+
+# magic, version, flags, row count, dictionary size, since version 3 the pick
+# table size, string table size, then since version 2 the draw stream seed and
+# counter.
+HEADER = _struct.Struct("<4sHHIIIIQQ")
+HEADER_V2 = _struct.Struct("<4sHHIIIQQ")
+HEADER_V1 = _struct.Struct("<4sHHIII")
+HEADERS = {1: HEADER_V1, 2: HEADER_V2, 3: HEADER}
+
+FLAG_SEEDED = 0x1
+
+
+class RosterFileError(ValueError):
+    pass
+
+
+class Layout(_tp.NamedTuple):
+    count: int
+    dict_count: int
+    pick_count: int
+    ids: int
+    offsets: int
+    picks: int
+    sex: int
+    state: int
+    remakes: int
+    strings: int
+    size: int
+
+    @classmethod
+    def compute(
+        cls,
+        count: int,
+        dict_count: int,
+        pick_count: int,
+        strings_size: int,
+        version: int = VERSION,
+    ) -> "Layout":
+        ids = HEADERS[version].size
+        if version < 3:
+            # One pick count per row, before the string offsets.
+            picks = ids + 4 * count
+            offsets = picks + 4 * count
+            sex = offsets + 4 * (count + dict_count + 1)
+        else:
+            offsets = ids + 4 * count
+            picks = offsets + 4 * (count + dict_count + pick_count + 1)
+            sex = picks + 4 * pick_count
+        state = sex + count
+        remakes = state + count
+        strings = remakes + count
+        return cls(
+            count,
+            dict_count,
+            pick_count,
+            ids,
+            offsets,
+            picks,
+            sex,
+            state,
+            remakes,
+            strings,
+            strings + strings_size,
+        )
+
+
+def write(
+    path: str,
+    rows: _tp.Iterable[tuple[int, _roster.NameInfo]],
+    pick_counts: _tp.Optional[dict[str, int]] = None,
+    rng_state: _tp.Optional[_roster.RngState] = None,
+) -> None:
+    """Write rows to `path` atomically, through a temporary file and a rename.
+
+    Layout after the header: row ids (u32), string offsets (u32, names then
+    dictionary values then pick table names), the pick table counts (u32), then
+    one u8 column each for sex, state and remakes indexing the dictionary, then
+    the UTF-8 string table with every string NUL terminated, so it can be
+    decoded and split in one pass. The pick table keeps the counts of every
+    name, also those not in `rows`.
+    """
+    rows = list(rows)
+    picked = [(n, c) for n, c in (pick_counts or {}).items() if c]
+    values: list[str] = []
+    codes: dict[str, int] = {}
+    columns: tuple[bytearray, ...] = (bytearray(), bytearray(), bytearray())
+    for _, info in rows:
+        for column, value in zip(columns, (info.sex, info.state, info.remakes)):
+            if (code := codes.get(value)) is None:
+                code = codes[value] = len(values)
+                values.append(value)
+            column.append(code)
+    if len(values) > 0xFF:
+        raise RosterFileError("too many distinct column values.")
+
+    encoded = [info.name.encode("UTF-8") for _, info in rows]
+    encoded.extend(v.encode("UTF-8") for v in values)
+    encoded.extend(n.encode("UTF-8") for n, _ in picked)
+    if any(b"\0" in data for data in encoded):
+        raise RosterFileError("strings must not contain NUL.")
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data) + 1)
+
+    count = len(rows)
+    seed, counter = rng_state or _roster.RngState()
+    flags = 0 if seed is None else FLAG_SEEDED
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as fp:
+        fp.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                flags,
+                count,
+                len(values),
+                len(picked),
+                offsets[-1],
+                seed or 0,
+                counter,
+            )
+        )
+        fp.write(_struct.pack("<%dI" % count, *(row_id for row_id, _ in rows)))
+        fp.write(_struct.pack("<%dI" % len(offsets), *offsets))
+        fp.write(_struct.pack("<%dI" % len(picked), *(c for _, c in picked)))
+        for column in columns:
+            fp.write(column)
+        fp.write(b"".join(data + b"\0" for data in encoded))
+        fp.flush()
+        _os.fsync(fp.fileno())
+    _os.replace(temp_path, path)
+
+
+class RosterFile(object):
+    def __init__(self, path: str) -> None:
+        """Read-only memory-mapped view of a file written by `write`.
+
+        Single rows are decoded on access, `rows` decodes the id column and
+        the string table in bulk.
+        """
+        self._fp = open(path, "rb")
+        try:
+            self._map = _mmap.mmap(self._fp.fileno(), 0, access=_mmap.ACCESS_READ)
+        except ValueError:
+            self._fp.close()
+            raise RosterFileError("empty roster file.")
+
+        magic, version = _struct.unpack_from("<4sH", self._map)
+        if magic != MAGIC:
+            self.close()
+            raise RosterFileError("not a roster file.")
+        if version not in HEADERS:
+            self.close()
+            raise RosterFileError("unsupported roster file version %d." % version)
+
+        flags, count, dict_count, *fields = HEADERS[version].unpack_from(self._map)[2:]
+        pick_count = fields.pop(0) if version >= 3 else 0
+        strings_size, *rng = fields
+        self._version = version
+        self._terminated = version >= 3
+        self._rng_state = _roster.RngState()
+        if flags & FLAG_SEEDED:
+            self._rng_state = _roster.RngState(*rng)
+        self._layout = Layout.compute(
+            count, dict_count, pick_count, strings_size, version
+        )
+        if len(self._map) < self._layout.size:
+            self.close()
+            raise RosterFileError("truncated roster file.")
+
+        self._values = [self._string(count + i) for i in range(dict_count)]
+
+    def __enter__(self) -> "RosterFile":
+        return self
+
+    def __exit__(self, *_: _tp.Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._layout.count
+
+    def _u32s(self, __base: int, __count: int, /) -> tuple[int, ...]:
+        return _struct.unpack_from("<%dI" % __count, self._map, __base)
+
+    def _string(self, __index: int, /) -> str:
+        start, end = _struct.unpack_from(
+            "<2I", self._map, self._layout.offsets + 4 * __index
+        )
+        base = self._layout.strings
+        return self._map[base + start : base + end - self._terminated].decode("UTF-8")
+
+    def _strings(self, __start: int, __stop: int, /) -> list[str]:
+        if __start >= __stop:
+            return []
+        layout = self._layout
+        start = self._u32s(layout.offsets + 4 * __start, 1)[0]
+        end = self._u32s(layout.offsets + 4 * __stop, 1)[0]
+        table = self._map[layout.strings + start : layout.strings + end]
+        if self._terminated:
+            return table[:-1].decode("UTF-8").split("\0")
+
+        offsets = self._u32s(layout.offsets + 4 * __start, __stop - __start + 1)
+        return [
+            table[i - start : j - start].decode("UTF-8")
+            for i, j in zip(offsets, offsets[1:])
+        ]
+
+    def row_id(self, __index: int, /) -> int:
+        return self._u32s(self._layout.ids + 4 * __index, 1)[0]
+
+    def info(self, __index: int, /) -> _roster.NameInfo:
+        layout = self._layout
+        return _roster.NameInfo(
+            name=self._string(__index),
+            sex=self._values[self._map[layout.sex + __index]],
+            state=self._values[self._map[layout.state + __index]],
+            remakes=self._values[self._map[layout.remakes + __index]],
+        )
+
+    def rows(self) -> list[tuple[int, _roster.NameInfo]]:
+        layout = self._layout
+        values = self._values.__getitem__
+        columns = [
+            map(values, self._map[start : start + layout.count])
+            for start in (layout.sex, layout.state, layout.remakes)
+        ]
+        # tuple.__new__ skips the length check of NameInfo._make.
+        infos = map(
+            tuple.__new__,
+            _itertools.repeat(_roster.NameInfo),
+            zip(self._strings(0, layout.count), *columns),
+        )
+        return list(zip(self._u32s(layout.ids, layout.count), infos))
+
+    @property
+    def rng_state(self) -> _roster.RngState:
+        return self._rng_state
+
+    def pick_counts(self) -> dict[str, int]:
+        layout = self._layout
+        if self._version < 3:
+            # Older files only kept the counts of the names in the roster.
+            counts: dict[str, int] = {}
+            names = self._strings(0, layout.count)
+            for name, picks in zip(names, self._u32s(layout.picks, layout.count)):
+                if picks:
+                    counts[name] = max(counts.get(name, 0), picks)
+            return counts
+
+        base = layout.count + layout.dict_count
+        names = self._strings(base, base + layout.pick_count)
+        return dict(zip(names, self._u32s(layout.picks, layout.pick_count)))
+
+    def close(self) -> None:
+        self._map.close()
+        self._fp.close()
@@ -0,0 +1,208 @@
+import random as _random
+import typing as _tp
+
+import roster as _roster
+
+# Every engine draws from the candidates in row id order and builds its tables
+# from the current rows and weights only, so a result depends on the generator
+# and the roster state, not on the history that led to that state.
+
+_DEFAULT_RNG = _random.Random()
+
+
+def permutation(
+    row_ids: _tp.Collection[int], rng: _random.Random = _DEFAULT_RNG
+) -> list[int]:
+    """Random permutation of `row_ids`, shuffled from row id order."""
+    ordered = sorted(row_ids)
+    rng.shuffle(ordered)
+    return ordered
+
+
+def partition(
+    row_ids: _tp.Collection[int],
+    group_size: int,
+    rng: _random.Random = _DEFAULT_RNG,
+) -> list[list[int]]:
+    if group_size < 1:
+        raise ValueError("group_size must be at least 1.")
+    shuffled = permutation(row_ids, rng)
+    return [
+        shuffled[i : i + group_size] for i in range(0, len(shuffled), group_size)
+    ]
+
+
+class WeightTree(object):
+    def __init__(self, weights: _tp.Sequence[float]) -> None:
+        """Binary sum tree over `weights`, O(n) to build, O(log n) per update.
+
+        Inner nodes are always recomputed as the sum of their two children,
+        never adjusted by a difference, so the tree only depends on the current
+        weights and not on the order they were set in.
+        """
+        size = 1
+        while size < len(weights):
+            size <<= 1
+        tree = [0.0] * (2 * size)
+        tree[size : size + len(weights)] = weights
+        for i in range(size - 1, 0, -1):
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+        self._size = size
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, __index: int, /) -> float:
+        return self._tree[self._size + __index]
+
+    @property
+    def total(self) -> float:
+        return self._tree[1]
+
+    def set(self, __index: int, __weight: float, /) -> None:
+        tree = self._tree
+        i = self._size + __index
+        tree[i] = __weight
+        while i > 1:
+            i >>= 1
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+
+    def sample(self, rng: _random.Random = _DEFAULT_RNG) -> int:
+        tree, size = self._tree, self._size
+        value = rng.random() * tree[1]
+        i = 1
+        while i < size:
+            i <<= 1
+            if value >= tree[i]:
+                value -= tree[i]
+                i += 1
+        return i - size
+
+
+class SamplingEngine(object):
+    def pick(
+        self, candidates: _tp.Collection[int], rng: _random.Random = _DEFAULT_RNG
+    ) -> int:
+        """Choose one row id out of a non-empty collection of candidates."""
+        raise NotImplementedError
+
+    def pick_many(
+        self,
+        candidates: _tp.Collection[int],
+        count: int,
+        rng: _random.Random = _DEFAULT_RNG,
+    ) -> list[int]:
+        """Choose up to `count` distinct row ids."""
+        return permutation(candidates, rng)[: max(count, 0)]
+
+
+class UniformEngine(SamplingEngine):
+    def pick(
+        self, candidates: _tp.Collection[int], rng: _random.Random = _DEFAULT_RNG
+    ) -> int:
+        if isinstance(candidates, _roster.RowPool):
+            return candidates.select(rng.randrange(len(candidates)))
+        return rng.choice(sorted(candidates))
+
+
+class WeightedEngine(SamplingEngine):
+    MAX_REJECTIONS = 32
+    MIN_CANDIDATES_RATIO = 0.25
+    MAX_STALE_RATIO = 0.25
+
+    def __init__(
+        self,
+        roster: _roster.Roster,
+        weight_func: _tp.Optional[_tp.Callable[[int], float]] = None,
+    ) -> None:
+        """Weighted draws through a `WeightTree` indexed by row id.
+
+        Candidates are a subset of the tree, other rows are rejected. Rows
+        changed since the last pick are refreshed in O(log n) each, past
+        `MAX_STALE_RATIO` of the roster the tree is rebuilt in O(n) instead.
+        `weight_func` must only depend on the row itself, rows sharing a name
+        are only refreshed when they change.
+        """
+        self._roster = roster
+        self._weight_func = weight_func or self.fairness_weight
+        self._tree: _tp.Optional[WeightTree] = None
+        self._stale: list[int] = []
+        roster.subscribe(self._changed)
+
+    def _changed(self, __change: _roster.RosterChange, /) -> None:
+        if self._tree is None:
+            return None
+        limit = len(self._roster) * self.MAX_STALE_RATIO + 64
+        if (__change.event_type == _roster.EVENT_CLEAR) or (
+            len(self._stale) + len(__change.row_ids) > limit
+        ):
+            self.invalidate()
+        else:
+            self._stale.extend(__change.row_ids)
+
+    def fairness_weight(self, __row_id: int, /) -> float:
+        return 1.0 / (1 + self._roster.pick_count(__row_id))
+
+    def _weight(self, __row_id: int, /) -> float:
+        return self._weight_func(__row_id) if __row_id in self._roster else 0.0
+
+    def invalidate(self) -> None:
+        self._tree = None
+        self._stale.clear()
+
+    def rebuild(self) -> None:
+        self._stale.clear()
+        self._tree = WeightTree([self._weight(i) for i in range(self._roster.next_id)])
+
+    def _refresh(self) -> WeightTree:
+        if (tree := self._tree) is None:
+            self.rebuild()
+            return self._tree
+        for row_id in self._stale:
+            if row_id >= len(tree):
+                self.rebuild()
+                return self._tree
+            if (weight := self._weight(row_id)) != tree[row_id]:
+                tree.set(row_id, weight)
+        self._stale.clear()
+        return tree
+
+    def _pick_rejection(
+        self, tree: WeightTree, candidates: _tp.Collection[int], rng: _random.Random
+    ) -> _tp.Optional[int]:
+        for _ in range(self.MAX_REJECTIONS):
+            row_id = tree.sample(rng)
+            if (row_id in candidates) and (tree[row_id] > 0):
+                return row_id
+
+    def _pick_linear(self, candidates: _tp.Collection[int], rng: _random.Random) -> int:
+        row_ids = sorted(candidates)
+        weights = [self._weight_func(i) for i in row_ids]
+        if not any(weights):
+            return rng.choice(row_ids)
+        return rng.choices(row_ids, weights)[0]
+
+    def pick(
+        self, candidates: _tp.Collection[int], rng: _random.Random = _DEFAULT_RNG
+    ) -> int:
+        tree = self._refresh()
+        if (tree.total > 0) and (
+            len(candidates) >= len(self._roster) * self.MIN_CANDIDATES_RATIO
+        ):
+            if (row_id := self._pick_rejection(tree, candidates, rng)) is not None:
+                return row_id
+        return self._pick_linear(candidates, rng)
+
+    def pick_many(
+        self,
+        candidates: _tp.Collection[int],
+        count: int,
+        rng: _random.Random = _DEFAULT_RNG,
+    ) -> list[int]:
+        remaining = set(candidates)
+        picked = []
+        while remaining and (len(picked) < count):
+            picked.append(row_id := self.pick(remaining, rng))
+            remaining.discard(row_id)
+        return picked
@@ -0,0 +1,5 @@
+import os as _os
+import sys as _sys
+
+# The modules live at the repository root and import each other by name.
+_sys.path.insert(0, _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__))))
@@ -0,0 +1,99 @@
+import itertools as _itertools
+import random as _random
+
+import pytest as _pytest
+
+import animation as _animation
+
+
+def make_schedule(update_interval=20, max_interval=1000, seed=0):
+    names = _itertools.count(100)
+    return _animation.SpinSchedule(
+        7, lambda: next(names), _random.Random(seed), update_interval, max_interval
+    )
+
+
+def test_spin_schedule_lands_on_winner():
+    schedule = make_schedule()
+    stopped = 2.5
+    assert not schedule.finished(stopped + schedule.stop_duration - 0.01, stopped)
+    assert schedule.finished(stopped + schedule.stop_duration, stopped)
+    assert schedule.name_at(stopped + schedule.stop_duration, stopped) == 7
+    assert not schedule.finished(100.0, None)
+
+
+def test_spin_schedule_tables():
+    schedule = make_schedule()
+    min_stop = _animation.SpinSchedule.MIN_STOP_TIME + 1.0
+    max_stop = _animation.SpinSchedule.MAX_STOP_TIME + 1.0
+    assert min_stop <= schedule.stop_duration <= max_stop
+    for table in (schedule.spin_up, schedule.slow_down):
+        assert table == sorted(table)
+    assert len(schedule.tail) == len(schedule.slow_down)
+    # Frames get further apart as the spin slows down.
+    gaps = [b - a for a, b in zip(schedule.slow_down, schedule.slow_down[1:])]
+    assert gaps[:-1] == _pytest.approx(sorted(gaps[:-1]))
+
+
+def test_spin_schedule_speed():
+    schedule = make_schedule()
+    accel = _animation.SpinSchedule.ACCELERATION_TIME
+    assert schedule.step(0.0) == 0
+    # One name per update interval once at full speed.
+    assert schedule.step(accel + 2.0) - schedule.step(accel + 1.0) == 50
+    steps = [schedule.step(t / 100) for t in range(400)]
+    assert steps == sorted(steps)
+
+
+def test_spin_schedule_is_seeded():
+    assert make_schedule(seed=3).slow_down == make_schedule(seed=3).slow_down
+
+
+def test_spin_schedule_constant_speed():
+    # No slow down when the end interval equals the running one.
+    schedule = make_schedule(update_interval=50, max_interval=50)
+    gaps = [b - a for a, b in zip(schedule.slow_down, schedule.slow_down[1:-1])]
+    assert gaps == _pytest.approx([0.05] * len(gaps))
+
+
+class FakeWidget(object):
+    def __init__(self):
+        self.calls = []
+
+    def after_idle(self, func):
+        self.calls.append(func)
+        return "after#%d" % len(self.calls)
+
+    def after(self, ms, func):
+        return self.after_idle(func)
+
+    def after_cancel(self, _):
+        self.calls.pop()
+
+    def run(self):
+        self.calls.pop(0)()
+
+
+def test_frame_scheduler_coalesces_requests():
+    widget, frames = FakeWidget(), []
+    scheduler = _animation.FrameScheduler(widget, frames.append)
+    scheduler.request()
+    scheduler.request()
+    assert scheduler.pending and len(widget.calls) == 1
+    widget.run()
+    assert len(frames) == 1 and not scheduler.pending
+
+    scheduler.request()
+    scheduler.cancel()
+    assert not widget.calls
+
+
+def test_frame_scheduler_loop():
+    widget, frames = FakeWidget(), []
+    scheduler = _animation.FrameScheduler(widget, frames.append)
+    scheduler.start_loop()
+    for _ in range(3):
+        widget.run()
+    assert scheduler.looping and len(frames) == 3 and scheduler.pending
+    scheduler.stop_loop()
+    assert not (scheduler.looping or scheduler.pending or widget.calls)
@@ -0,0 +1,24 @@
+import pytest as _pytest
+
+import cli as _cli
+
+
+@_pytest.mark.parametrize(
+    "argv",
+    [
+        ["draw", "-n", "0"],
+        ["draw", "--count", "-1"],
+        ["groups", "0"],
+        ["groups", "two"],
+    ],
+)
+def test_rejects_non_positive_counts(argv, capsys):
+    with _pytest.raises(SystemExit):
+        _cli.build_parser().parse_args(argv)
+    assert "not a positive integer" in capsys.readouterr().err
+
+
+def test_accepts_positive_counts():
+    parser = _cli.build_parser()
+    assert parser.parse_args(["draw", "-n", "3"]).count == 3
+    assert parser.parse_args(["groups", "4"]).size == 4
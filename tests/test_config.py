@@ -0,0 +1,21 @@
+import time as _time
+
+import config as _config
+
+
+def test_autosaver_writes_during_a_steady_stream(monkeypatch):
+    writes = []
+    counter = iter(range(1000))
+    monkeypatch.setattr(_config, "Collect", lambda: {"n": next(counter)})
+    monkeypatch.setattr(_config, "Write", lambda cfg, path: writes.append(cfg["n"]))
+
+    saver = _config.AutoSaver(debounce=0.05, max_latency=0.1)
+    end = _time.monotonic() + 0.5
+    while _time.monotonic() < end:
+        saver.request()
+        _time.sleep(0.01)
+    # Requests never paused for `debounce`, the cap still forced writes.
+    assert len(writes) >= 2
+    saver.close()
+    assert writes == sorted(writes)
+    assert writes[-1] == next(counter) - 1
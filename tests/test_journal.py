@@ -0,0 +1,187 @@
+import json as _json
+
+import pytest as _pytest
+
+import config as _config
+import journal as _journal
+import roster as _roster
+
+A = _roster.NameInfo("a", _roster.MALE, _roster.NOT_DRAWN, _roster.EN)
+B = _roster.NameInfo("b", _roster.FEMALE, _roster.NOT_DRAWN, _roster.NONE)
+
+
+def open_session(tmp_path, **kwargs):
+    journal = _journal.Journal(
+        str(tmp_path / "roster.journal"),
+        str(tmp_path / "roster.{key}.rcsn"),
+        keys=(_journal.ROSTER_NAMES,),
+        **kwargs,
+    )
+    state = journal.replay()
+    roster = _roster.Roster()
+    roster.load_rows(state.rosters.get(_journal.ROSTER_NAMES, {}).items())
+    roster.load_pick_counts(state.pick_counts.get(_journal.ROSTER_NAMES, {}))
+    roster.load_rng_state(
+        state.rng_states.get(_journal.ROSTER_NAMES, _roster.RngState())
+    )
+    journal.attach(_journal.ROSTER_NAMES, roster)
+    return journal, roster
+
+
+def test_replay_restores_every_event(tmp_path):
+    journal, roster = open_session(tmp_path)
+    assert not journal.exists
+    a, b = roster.insert_many((A, B))
+    roster.update(b, B._replace(remakes=_roster.JP))
+    roster.set_state(a, _roster.DRAWN)
+    roster.record_picks((a, b))
+    roster.delete(a)
+    rows = dict(roster.rows())
+    journal.close()
+
+    journal, roster = open_session(tmp_path)
+    assert journal.exists
+    assert dict(roster.rows()) == rows
+    assert roster.pick_counts == {"a": 1, "b": 1}
+    roster.clear()
+    journal.close()
+    assert len(open_session(tmp_path)[1]) == 0
+
+
+def test_replay_after_compaction(tmp_path):
+    journal, roster = open_session(tmp_path)
+    a = roster.insert(A)
+    roster.record_picks((a,))
+    journal.compact(wait=True)
+    assert not (tmp_path / "roster.journal").exists()
+    b = roster.insert(B)
+    roster.set_state(a, _roster.DRAWN)
+    journal.close()
+
+    _, roster = open_session(tmp_path)
+    assert dict(roster.rows()) == {a: A._replace(state=_roster.DRAWN), b: B}
+    assert roster.pick_counts == {"a": 1}
+
+
+def test_compacts_past_threshold(tmp_path):
+    journal, roster = open_session(tmp_path, compact_threshold=2000)
+    for i in range(100):
+        roster.insert(A._replace(name="n%d" % i))
+    journal.close()
+    assert (tmp_path / "roster.names.rcsn").exists()
+    assert len(open_session(tmp_path)[1]) == 100
+
+
+def test_keeps_unfinished_compaction_segment(tmp_path):
+    journal, roster = open_session(tmp_path)
+    a = roster.insert(A)
+    journal.close()
+    # A crash after the rotation, before the snapshot was written.
+    (tmp_path / "roster.journal").rename(tmp_path / "roster.journal.compacting")
+
+    journal, roster = open_session(tmp_path)
+    b = roster.insert(B)
+    journal.compact(wait=True)
+    journal.close()
+    assert not (tmp_path / "roster.journal.compacting").exists()
+    assert dict(open_session(tmp_path)[1].rows()) == {a: A, b: B}
+
+
+def test_draw_stream_survives_replay_and_compaction(tmp_path):
+    journal, roster = open_session(tmp_path)
+    a = roster.insert(A)
+    roster.next_rng()
+    roster.record_picks((a,))
+    journal.compact(wait=True)
+    roster.next_rng()
+    roster.record_picks((a,))
+    state = roster.rng_state
+    journal.close()
+
+    _, roster = open_session(tmp_path)
+    assert roster.rng_state == state
+
+
+def test_migrates_legacy_json_snapshot(tmp_path):
+    legacy_path = tmp_path / "roster.snapshot.json"
+    legacy_path.write_text(
+        _json.dumps(
+            {
+                "rosters": {_journal.ROSTER_NAMES: [[4, *A]]},
+                "pick_counts": {_journal.ROSTER_NAMES: {"a": 3}},
+            }
+        ),
+        encoding="UTF-8",
+    )
+    journal, roster = open_session(tmp_path, legacy_snapshot_path=str(legacy_path))
+    assert journal.needs_migration
+    assert dict(roster.rows()) == {4: A}
+    _journal.migrate_legacy(journal)
+    journal.close()
+    assert not legacy_path.exists()
+
+    journal, roster = open_session(tmp_path, legacy_snapshot_path=str(legacy_path))
+    assert not journal.needs_migration
+    assert roster.pick_counts == {"a": 3}
+
+
+def test_load_state_from_legacy_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(_config, "CFG_NAMES", _roster.dump_infos((A, B)), False)
+    monkeypatch.setattr(_config, "CFG_DELETED_NAMES", [], False)
+    monkeypatch.setattr(_config, "CFG_PICK_COUNTS", {"b": 2}, False)
+    journal = _journal.Journal(
+        str(tmp_path / "roster.journal"), str(tmp_path / "roster.{key}.rcsn")
+    )
+    state = _journal.load_state(journal)
+    assert state.rosters[_journal.ROSTER_NAMES] == {0: A, 1: B}
+    assert state.pick_counts[_journal.ROSTER_NAMES] == {"b": 2}
+    assert _journal.load_state(journal, legacy=False).rosters == {}
+
+
+def test_torn_write_then_new_session(tmp_path):
+    journal, roster = open_session(tmp_path)
+    a = roster.insert(A)
+    journal.close()
+    with open(tmp_path / "roster.journal", "ab") as fp:
+        fp.write(b'{"roster": "names", "event": "ins')
+
+    journal, roster = open_session(tmp_path)
+    b = roster.insert(B)
+    roster.set_state(a, _roster.DRAWN)
+    journal.close()
+
+    _, roster = open_session(tmp_path)
+    assert dict(roster.rows()) == {a: A._replace(state=_roster.DRAWN), b: B}
+
+
+@_pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_failed_snapshot_allows_later_compaction(tmp_path, monkeypatch):
+    journal, roster = open_session(tmp_path)
+    a = roster.insert(A)
+
+    def _fail(*_):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(_journal._rosterfile, "write", _fail)
+        journal.compact(wait=True)
+    assert (tmp_path / "roster.journal.compacting").exists()
+
+    b = roster.insert(B)
+    journal.compact(wait=True)
+    journal.close()
+    assert not (tmp_path / "roster.journal.compacting").exists()
+    _, roster = open_session(tmp_path)
+    assert dict(roster.rows()) == {a: A, b: B}
+
+
+def test_compaction_keeps_pick_counts_of_deleted_names(tmp_path):
+    journal, roster = open_session(tmp_path)
+    a, b = roster.insert_many((A, B))
+    roster.record_picks((a, a, b))
+    roster.delete(a)
+    journal.compact(wait=True)
+    journal.close()
+
+    _, roster = open_session(tmp_path)
+    assert roster.pick_counts == {"a": 2, "b": 1}
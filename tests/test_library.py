@@ -0,0 +1,92 @@
+import pytest as _pytest
+
+import config as _config
+import journal as _journal
+import library as _library
+import roster as _roster
+
+A = _roster.NameInfo("a", _roster.MALE, _roster.NOT_DRAWN, _roster.EN)
+
+
+@_pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setattr(_config, "JOURNALPATH", str(tmp_path / "roster.journal"))
+    monkeypatch.setattr(_config, "SNAPSHOTPATH", str(tmp_path / "roster.{key}.rcsn"))
+    monkeypatch.setattr(
+        _config, "LEGACY_SNAPSHOTPATH", str(tmp_path / "roster.snapshot.json")
+    )
+    monkeypatch.setattr(_config, "ROSTERSPATH", str(tmp_path / "rosters"))
+    monkeypatch.setattr(_config, "CFG_NAMES", [], False)
+    monkeypatch.setattr(_config, "CFG_DELETED_NAMES", [], False)
+    monkeypatch.setattr(_config, "CFG_PICK_COUNTS", {}, False)
+    return tmp_path
+
+
+@_pytest.mark.parametrize("name", ["", "  ", "..", "a/b"])
+def test_check_name_rejects(name):
+    with _pytest.raises(ValueError):
+        _library.RosterLibrary.check_name(name)
+
+
+def test_create_and_list(home):
+    library = _library.RosterLibrary()
+    assert library.names() == [_config.DEFAULT_ROSTER]
+    assert library.create(" 二班 ") == "二班"
+    library.create("一班")
+    assert library.names() == [_config.DEFAULT_ROSTER, "一班", "二班"]
+    with _pytest.raises(ValueError):
+        library.create("一班")
+    with _pytest.raises(KeyError):
+        library.open("三班")
+
+
+def test_rosters_are_kept_apart(home):
+    library = _library.RosterLibrary()
+    library.create("一班")
+    library.open("一班").names.insert(A)
+    assert len(library.open(_config.DEFAULT_ROSTER).names) == 0
+    library.close()
+
+    library = _library.RosterLibrary()
+    assert library.open("一班").names.items() == [A]
+    assert (home / "rosters" / "一班" / "roster.journal").exists()
+    library.close()
+
+
+def test_least_recently_used_is_closed(home):
+    library = _library.RosterLibrary(capacity=2)
+    for name in ("一班", "二班"):
+        library.create(name)
+    default = library.open(_config.DEFAULT_ROSTER)
+    library.open("一班")
+    library.open(_config.DEFAULT_ROSTER)
+    library.open("二班")
+    assert library.loaded == (_config.DEFAULT_ROSTER, "二班")
+    assert library.open(_config.DEFAULT_ROSTER) is default
+    library.close()
+    assert library.loaded == ()
+
+
+def test_more_classes_than_capacity(home):
+    library = _library.RosterLibrary()
+    names = ["%d班" % i for i in range(library.CAPACITY + 3)]
+    for name in names:
+        library.create(name)
+        library.open(name).names.insert(A._replace(name=name))
+    assert library.loaded == tuple(names[3:])
+
+    # A class closed to make room comes back from its journal.
+    first = library.open(names[0])
+    assert first.names.items() == [A._replace(name=names[0])]
+    assert library.loaded == (*names[4:], names[0])
+    assert len(library.open(names[-1]).names) == 1
+    library.close()
+
+
+def test_engine_is_cached(home):
+    library = _library.RosterLibrary()
+    loaded = library.open(_config.DEFAULT_ROSTER)
+    assert loaded.engine(True) is loaded.engine(True)
+    assert loaded.engine(True) is not loaded.engine(False)
+    assert loaded.names is loaded.rosters[_journal.ROSTER_NAMES]
+    library.close()
@@ -0,0 +1,36 @@
+import roster as _roster
+
+
+def test_namelist_reader(tmp_path):
+    path = tmp_path / "namelist.txt"
+    path.write_bytes(
+        "张三me\n\n李四fj\n  王五fe  \nxe\n赵六xe\n钱七mz\n".encode("UTF-8")
+        + b"\xff\xfeme\n"
+        + "孙八fe".encode("UTF-8")
+    )
+    reader = _roster.NamelistReader(str(path))
+    assert reader.progress == 0.0
+    chunks = list(reader.chunks(2))
+    assert [len(c) for c in chunks] == [2, 2]
+    assert chunks[0][0] == _roster.NameInfo(
+        "张三", _roster.MALE, _roster.NOT_DRAWN, _roster.EN
+    )
+    assert [i.name for c in chunks for i in c] == ["张三", "李四", "王五", "孙八"]
+    assert [(i.lineno, i.reason) for i in reader.issues] == [
+        (5, "missing name or codes"),
+        (6, "unknown sex code 'x'"),
+        (7, "unknown remakes code 'z'"),
+        (8, "undecodable line"),
+    ]
+    assert reader.progress == 1.0
+
+
+def test_namelist_round_trip(tmp_path):
+    infos = [
+        _roster.NameInfo("a", _roster.MALE, _roster.NOT_DRAWN, _roster.EN),
+        _roster.NameInfo("b", _roster.FEMALE, _roster.NOT_DRAWN, _roster.JP),
+        _roster.NameInfo("c", _roster.MALE, _roster.NOT_DRAWN, _roster.NONE),
+    ]
+    path = tmp_path / "namelist.txt"
+    path.write_text("\n".join(_roster.dump_namelist(infos)), encoding="UTF-8")
+    assert list(_roster.NamelistReader(str(path))) == infos
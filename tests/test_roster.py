@@ -0,0 +1,111 @@
+import pytest as _pytest
+
+import roster as _roster
+
+A = _roster.NameInfo("a", _roster.MALE, _roster.NOT_DRAWN, _roster.EN)
+B = _roster.NameInfo("b", _roster.FEMALE, _roster.NOT_DRAWN, _roster.JP)
+C = _roster.NameInfo("c", _roster.MALE, _roster.DRAWN, _roster.NONE)
+
+
+def test_rows_keep_stable_ids():
+    roster = _roster.Roster((A, B))
+    c = roster.insert(C)
+    roster.delete(0)
+    assert roster.row_ids == [1, c]
+    assert roster.insert(A) == 3
+    assert roster.index(3) == 2
+    with _pytest.raises(KeyError):
+        roster.insert(B, row_id=1)
+
+
+def test_indexes_follow_changes():
+    roster = _roster.Roster((A, B, C))
+    assert roster.query(sex=_roster.MALE) == [0, 2]
+    assert roster.query(state=_roster.NOT_DRAWN, sex=_roster.MALE) == [0]
+    assert roster.count(state=_roster.DRAWN) == 1
+
+    roster.set_state(0, _roster.DRAWN)
+    roster.update(1, B._replace(sex=_roster.MALE))
+    assert roster.query(state=_roster.DRAWN) == [0, 2]
+    assert roster.query(sex=_roster.MALE) == [0, 1, 2]
+
+    assert set(roster.reset()) == {0, 2}
+    assert roster.count(state=_roster.NOT_DRAWN) == 3
+    roster.delete(1)
+    assert roster.select(sex=_roster.MALE) == [A, C._replace(state=_roster.NOT_DRAWN)]
+    roster.clear()
+    assert roster.count(sex=_roster.MALE) == 0
+    with _pytest.raises(KeyError):
+        roster.query(name="a")
+
+
+def test_combined_candidates_are_live():
+    roster = _roster.Roster((A, B, C))
+    male = roster.candidates(state=_roster.NOT_DRAWN, sex=_roster.MALE)
+    every = roster.candidates(
+        state=_roster.NOT_DRAWN, sex=_roster.MALE, remakes=_roster.EN
+    )
+    assert isinstance(male, _roster.RowPool)
+    assert male is roster.candidates(sex=_roster.MALE, state=_roster.NOT_DRAWN)
+    assert set(male) == set(every) == {0}
+
+    roster.insert(A._replace(name="d"))
+    roster.update(1, B._replace(sex=_roster.MALE))
+    roster.set_state(0, _roster.DRAWN)
+    assert set(male) == {1, 3}
+    assert set(every) == {3}
+    roster.reset()
+    roster.delete(3)
+    assert set(male) == roster.match(state=_roster.NOT_DRAWN, sex=_roster.MALE)
+    roster.clear()
+    assert len(male) == len(every) == 0
+    roster.insert(A)
+    assert set(male) == {4}
+    with _pytest.raises(KeyError):
+        roster.candidates(state=_roster.NOT_DRAWN, name="a")
+
+
+def test_notifications():
+    roster = _roster.Roster((A, B))
+    changes = []
+    roster.subscribe(changes.append)
+    roster.set_state_many((0, 1), _roster.DRAWN)
+    roster.set_state(0, _roster.DRAWN)
+    roster.record_picks((1,))
+    roster.delete(0)
+    roster.unsubscribe(changes.append)
+    roster.clear()
+    assert changes == [
+        _roster.RosterChange(_roster.EVENT_UPDATE, (0, 1)),
+        _roster.RosterChange(_roster.EVENT_PICK, (1,)),
+        _roster.RosterChange(_roster.EVENT_DELETE, (0,)),
+    ]
+
+
+def test_pick_counts_follow_names():
+    roster = _roster.Roster((A, B))
+    roster.record_picks((0, 0, 1))
+    roster.clear()
+    a = roster.insert(A)
+    assert roster.pick_count(a) == 2
+    assert roster.pick_counts == {"a": 2, "b": 1}
+
+
+def test_draw_stream_resumes():
+    roster = _roster.Roster()
+    roster.load_rng_state(_roster.RngState(5, 0))
+    first = [roster.next_rng().random() for _ in range(3)]
+    assert roster.rng_state == _roster.RngState(5, 3)
+
+    resumed = _roster.Roster()
+    resumed.load_rng_state(_roster.RngState(5, 1))
+    assert [resumed.next_rng().random() for _ in range(2)] == first[1:]
+
+    unseeded = _roster.Roster()
+    unseeded.next_rng()
+    assert unseeded.rng_state.seed is not None
+
+
+def test_infos_round_trip():
+    infos = [A._replace(name="a-b"), C]
+    assert _roster.load_infos(_roster.dump_infos(infos)) == infos
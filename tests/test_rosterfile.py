@@ -0,0 +1,88 @@
+import struct as _struct
+
+import pytest as _pytest
+
+import roster as _roster
+import rosterfile as _rosterfile
+
+A = _roster.NameInfo("张三", _roster.MALE, _roster.DRAWN, _roster.EN)
+B = _roster.NameInfo("b", _roster.FEMALE, _roster.NOT_DRAWN, "自定义")
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "roster.rcsn")
+    rows = [(3, A), (7, B)]
+    _rosterfile.write(path, rows, {"张三": 2}, _roster.RngState(42, 5))
+    with _rosterfile.RosterFile(path) as roster_file:
+        assert len(roster_file) == 2
+        assert list(roster_file.rows()) == rows
+        assert roster_file.info(1) == B
+        assert roster_file.row_id(1) == 7
+        assert roster_file.pick_counts() == {"张三": 2}
+        assert roster_file.rng_state == _roster.RngState(42, 5)
+
+
+def test_unseeded_and_empty(tmp_path):
+    path = str(tmp_path / "roster.rcsn")
+    _rosterfile.write(path, [])
+    with _rosterfile.RosterFile(path) as roster_file:
+        assert list(roster_file.rows()) == []
+        assert roster_file.pick_counts() == {}
+        assert roster_file.rng_state == _roster.RngState()
+
+
+def test_keeps_pick_counts_of_names_not_in_rows(tmp_path):
+    path = str(tmp_path / "roster.rcsn")
+    _rosterfile.write(path, [(0, B)], {"a": 2, "b": 1, "c": 0})
+    with _rosterfile.RosterFile(path) as roster_file:
+        assert roster_file.pick_counts() == {"a": 2, "b": 1}
+
+
+def test_rejects_nul_in_strings(tmp_path):
+    with _pytest.raises(_rosterfile.RosterFileError, match="NUL"):
+        _rosterfile.write(str(tmp_path / "roster.rcsn"), [(0, B._replace(name="a\0"))])
+
+
+def test_reads_version_2(tmp_path):
+    name, values = "a".encode(), [v.encode() for v in (A.sex, A.state, A.remakes)]
+    strings = [name, *values]
+    offsets = [0]
+    for data in strings:
+        offsets.append(offsets[-1] + len(data))
+    path = tmp_path / "roster.rcsn"
+    path.write_bytes(
+        _rosterfile.HEADER_V2.pack(
+            _rosterfile.MAGIC, 2, _rosterfile.FLAG_SEEDED, 1, 3, offsets[-1], 9, 1
+        )
+        + _struct.pack("<II", 4, 3)
+        + _struct.pack("<5I", *offsets)
+        + bytes((0, 1, 2))
+        + b"".join(strings)
+    )
+    with _rosterfile.RosterFile(str(path)) as roster_file:
+        assert list(roster_file.rows()) == [(4, A._replace(name="a"))]
+        assert roster_file.pick_counts() == {"a": 3}
+        assert roster_file.rng_state == _roster.RngState(9, 1)
+
+
+@_pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"", "empty"),
+        (b"XXXX\x03\x00" + bytes(40), "not a roster file"),
+        (b"RCSN\x63\x00" + bytes(40), "unsupported"),
+    ],
+)
+def test_rejects_bad_files(tmp_path, data, message):
+    path = tmp_path / "roster.rcsn"
+    path.write_bytes(data)
+    with _pytest.raises(_rosterfile.RosterFileError, match=message):
+        _rosterfile.RosterFile(str(path))
+
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / "roster.rcsn"
+    _rosterfile.write(str(path), [(0, A)])
+    path.write_bytes(path.read_bytes()[:-1])
+    with _pytest.raises(_rosterfile.RosterFileError, match="truncated"):
+        _rosterfile.RosterFile(str(path))
@@ -0,0 +1,47 @@
+import random as _random
+
+import pytest as _pytest
+
+import roster as _roster
+
+
+def test_row_pool_swap_remove():
+    pool = _roster.RowPool(range(5))
+    pool.discard(1)
+    pool.discard(1)
+    assert list(pool) == [0, 4, 2, 3]
+    assert (4 in pool) and (1 not in pool)
+    pool.discard(3)
+    assert list(pool) == [0, 4, 2]
+
+    rng = _random.Random(0)
+    drawn = {pool.draw(rng) for _ in range(3)}
+    assert drawn == {0, 2, 4}
+    assert len(pool) == 0
+
+
+def test_row_pool_select_by_rank():
+    rng = _random.Random(1)
+    pool, expected = _roster.RowPool(), set()
+    for step in range(5000):
+        row_id = rng.randrange(300 if step < 2500 else 3000)
+        if rng.random() < 0.6:
+            pool.add(row_id)
+            expected.add(row_id)
+        else:
+            pool.discard(row_id)
+            expected.discard(row_id)
+        if expected and (step % 7 == 0):
+            rank = rng.randrange(len(expected))
+            assert pool.select(rank) == sorted(expected)[rank]
+    with _pytest.raises(IndexError):
+        pool.select(len(pool))
+
+
+def test_rank_index():
+    ranks = _roster.RankIndex([9, 2, 5])
+    assert [ranks.select(k) for k in range(3)] == [2, 5, 9]
+    assert ranks.covers(15) and not ranks.covers(16)
+    ranks.update(2, -1)
+    ranks.update(0, 1)
+    assert [ranks.select(k) for k in range(3)] == [0, 5, 9]
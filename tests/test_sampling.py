@@ -0,0 +1,172 @@
+import random as _random
+
+import pytest as _pytest
+
+import roster as _roster
+import sampling as _sampling
+
+
+def make_roster(size, seed=0):
+    rng = _random.Random(seed)
+    sexes = (_roster.MALE, _roster.FEMALE)
+    return _roster.Roster(
+        _roster.NameInfo("n%d" % i, rng.choice(sexes), _roster.NOT_DRAWN, _roster.EN)
+        for i in range(size)
+    )
+
+
+def churned_and_reloaded(size=200, seed=1):
+    """The same roster state reached through swap-removes and through a reload."""
+    rng = _random.Random(seed)
+    churned = make_roster(size)
+    churned.set_state_many(rng.sample(range(size), size // 2), _roster.DRAWN)
+    churned.set_state_many(rng.sample(range(size), size // 4), _roster.NOT_DRAWN)
+    churned.record_picks(rng.sample(range(size), size // 3))
+
+    reloaded = _roster.Roster()
+    reloaded.load_rows(sorted(churned.rows(), reverse=True))
+    reloaded.load_pick_counts(churned.pick_counts)
+    return churned, reloaded
+
+
+@_pytest.mark.parametrize(
+    "engine_factory",
+    [lambda _: _sampling.UniformEngine(), _sampling.WeightedEngine],
+    ids=["uniform", "weighted"],
+)
+def test_pick_depends_only_on_roster_state(engine_factory):
+    rosters = churned_and_reloaded()
+    engines = [engine_factory(r) for r in rosters]
+    # Build the tables of one engine before the last change.
+    engines[0].pick(rosters[0].candidates(state=_roster.NOT_DRAWN))
+    for r in rosters:
+        r.record_picks((3, 4))
+
+    for seed in range(20):
+        picks = [
+            engine.pick(r.candidates(state=_roster.NOT_DRAWN), _random.Random(seed))
+            for engine, r in zip(engines, rosters)
+        ]
+        assert picks[0] == picks[1]
+        batches = [
+            engine.pick_many(
+                r.match(state=_roster.NOT_DRAWN, sex=_roster.MALE),
+                5,
+                _random.Random(seed),
+            )
+            for engine, r in zip(engines, rosters)
+        ]
+        assert batches[0] == batches[1]
+
+
+def test_filtered_pick_follows_row_id_order():
+    roster = make_roster(300)
+    criteria = {"state": _roster.NOT_DRAWN, "sex": _roster.MALE}
+    candidates = roster.candidates(**criteria)
+    rng = _random.Random(5)
+    roster.set_state_many(rng.sample(range(300), 200), _roster.DRAWN)
+    roster.set_state_many(rng.sample(range(300), 100), _roster.NOT_DRAWN)
+
+    engine = _sampling.UniformEngine()
+    for seed in range(20):
+        expected = _random.Random(seed).choice(sorted(roster.match(**criteria)))
+        assert engine.pick(candidates, _random.Random(seed)) == expected
+
+
+def test_partition_depends_only_on_candidates():
+    rosters = churned_and_reloaded()
+    groups = [
+        _sampling.partition(r.candidates(state=_roster.NOT_DRAWN), 4, _random.Random(3))
+        for r in rosters
+    ]
+    assert groups[0] == groups[1]
+    assert sorted(sum(groups[0], [])) == rosters[1].query(state=_roster.NOT_DRAWN)
+    assert {len(g) for g in groups[0][:-1]} == {4}
+
+
+def test_weighted_engine_only_picks_candidates():
+    roster = make_roster(40)
+    engine = _sampling.WeightedEngine(roster)
+    rng = _random.Random(0)
+    # Above and below MIN_CANDIDATES_RATIO, the rejection and linear paths.
+    for candidates in (set(range(0, 40, 2)), {5, 7}):
+        assert {engine.pick(candidates, rng) for _ in range(200)} <= candidates
+
+
+def test_weighted_engine_favours_fewer_picks():
+    roster = make_roster(2)
+    roster.record_picks((0, 0, 0))
+    engine = _sampling.WeightedEngine(roster)
+    rng = _random.Random(0)
+    picks = [engine.pick({0, 1}, rng) for _ in range(4000)]
+    # Weights 1/4 and 1, so row 0 is picked a fifth of the time.
+    assert abs(picks.count(0) / len(picks) - 0.2) < 0.03
+
+
+def test_weighted_engine_follows_new_picks():
+    roster = make_roster(2)
+    engine = _sampling.WeightedEngine(roster)
+    engine.pick({0, 1})
+    roster.record_picks([1] * 50)
+    rng = _random.Random(0)
+    assert [engine.pick({0, 1}, rng) for _ in range(50)].count(1) < 10
+
+
+def test_pick_many_is_distinct_and_bounded():
+    roster = make_roster(10)
+    rng = _random.Random(0)
+    for engine in (_sampling.UniformEngine(), _sampling.WeightedEngine(roster)):
+        picks = engine.pick_many(set(range(6)), 4, rng)
+        assert len(set(picks)) == 4 and set(picks) <= set(range(6))
+        assert sorted(engine.pick_many(set(range(6)), 10, rng)) == list(range(6))
+        assert engine.pick_many(set(range(6)), -1, rng) == []
+
+
+def test_partition_rejects_empty_groups():
+    with _pytest.raises(ValueError):
+        _sampling.partition(range(4), 0)
+
+
+def test_weight_tree_distribution():
+    weights = [1.0, 0.0, 3.0, 0.5, 0.5]
+    tree = _sampling.WeightTree(weights)
+    rng = _random.Random(0)
+    draws = 50000
+    counts = [0] * len(tree)
+    for _ in range(draws):
+        counts[tree.sample(rng)] += 1
+    assert counts[1] == counts[5] == 0
+    for count, weight in zip(counts, weights):
+        assert abs(count / draws - weight / sum(weights)) < 0.01
+
+
+def test_weight_tree_ignores_update_order():
+    rng = _random.Random(0)
+    weights = [rng.random() for _ in range(100)]
+    built = _sampling.WeightTree(weights)
+    updated = _sampling.WeightTree([0.0] * 100)
+    for i in rng.sample(range(100), 100):
+        updated.set(i, rng.random())
+    for i in rng.sample(range(100), 100):
+        updated.set(i, weights[i])
+    assert updated._tree == built._tree
+
+
+def test_fair_draws_stay_incremental():
+    roster = make_roster(5000)
+    calls = []
+
+    def _weight(row_id):
+        calls.append(row_id)
+        return 1.0 / (1 + roster.pick_count(row_id))
+
+    engine = _sampling.WeightedEngine(roster, _weight)
+    rng = _random.Random(0)
+    engine.pick(roster.candidates(state=_roster.NOT_DRAWN), rng)
+    calls.clear()
+    for _ in range(100):
+        row_id = engine.pick(roster.candidates(state=_roster.NOT_DRAWN), rng)
+        roster.record_picks((row_id,))
+        roster.set_state(row_id, _roster.DRAWN)
+    # Only the rows each commit touched are weighed again.
+    assert len(calls) <= 2 * 100